@@ -0,0 +1,145 @@
+import time
+import json
+import asyncio
+from typing import Any, AsyncIterator, Iterator, List
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+
+from backend.src.output_schemas import ContextCompleteness, ConversationResponse
+
+
+def count_words(text: str) -> int:
+    """Token counter for the benchmark: a word count is close enough and needs no tokenizer files."""
+    return len(text.split())
+
+
+def _count_tokens(messages: List[BaseMessage]) -> int:
+    return sum(count_words(str(message.content)) for message in messages)
+
+
+class FakeChatModel(BaseChatModel):
+    """Deterministic chat model stand-in with configurable latency and token rate.
+
+    Replies are chosen from the system prompt so every node gets an answer it
+    can parse: the master router is told to use the conversation path, the
+    translator echoes its input as JSON, the letter prompt gets
+    `letter_tokens` words and structured-output calls return fixed objects.
+    Each call waits `latency` seconds before its first token and then emits
+    `tokens_per_second`, and reports usage like the OpenAI models do.
+    """
+
+    model_name: str = "fake-chat"
+    latency: float = 0.05
+    tokens_per_second: float = 500.0
+    letter_tokens: int = 300
+
+    @property
+    def _llm_type(self) -> str:
+        return "benchmark-fake-chat"
+
+    def _reply(self, messages: List[BaseMessage]) -> str:
+        system = str(messages[0].content) if messages else ""
+        user = str(messages[-1].content) if messages else ""
+        if "master router" in system:
+            return "context_gatherer_agent"
+        if "translation assistant" in system:
+            text = user.split("---\n", 1)[-1].rsplit("\n---", 1)[0]
+            return json.dumps({"translated_text": text})
+        if "running summary" in system:
+            return "The user is preparing a letter of recommendation for the client."
+        if "Letters of Recommendation (LOR)" in system:
+            return " ".join(["word"] * self.letter_tokens)
+        return "OK"
+
+    def _message(self, messages: List[BaseMessage], text: str, cls=AIMessage):
+        prompt_tokens = _count_tokens(messages)
+        completion_tokens = len(text.split())
+        return cls(
+            content=text,
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+            response_metadata={"model_name": self.model_name},
+        )
+
+    def _duration(self, text: str) -> float:
+        return self.latency + len(text.split()) / self.tokens_per_second
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        text = self._reply(messages)
+        time.sleep(self._duration(text))
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, text))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        text = self._reply(messages)
+        await asyncio.sleep(self._duration(text))
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, text))])
+
+    def _chunks(self, messages: List[BaseMessage]) -> Iterator[AIMessageChunk]:
+        words = self._reply(messages).split()
+        for i, word in enumerate(words):
+            yield AIMessageChunk(content=word if i == 0 else f" {word}")
+        # Usage arrives on a final empty chunk, as with `stream_usage=True`.
+        usage = self._message(messages, " ".join(words), cls=AIMessageChunk)
+        usage.content = ""
+        yield usage
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency)
+        for chunk in self._chunks(messages):
+            if chunk.content:
+                time.sleep(1 / self.tokens_per_second)
+            yield ChatGenerationChunk(message=chunk)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency)
+        for chunk in self._chunks(messages):
+            if chunk.content:
+                await asyncio.sleep(1 / self.tokens_per_second)
+            yield ChatGenerationChunk(message=chunk)
+
+    def _structured(self, schema) -> Any:
+        if schema is ContextCompleteness:
+            return ContextCompleteness(missing_fields=[], follow_up_question="")
+        if schema is ConversationResponse:
+            return ConversationResponse(response="Could you share the client's full name and pronouns?")
+        return schema.model_construct()
+
+    def with_structured_output(self, schema, **kwargs):
+        def invoke(messages):
+            time.sleep(self.latency + 20 / self.tokens_per_second)
+            return self._structured(schema)
+
+        async def ainvoke(messages):
+            await asyncio.sleep(self.latency + 20 / self.tokens_per_second)
+            return self._structured(schema)
+
+        return RunnableLambda(invoke, afunc=ainvoke)
+
+
+class FakeEmbeddings(DeterministicFakeEmbedding):
+    """Deterministic embeddings that wait `latency` seconds per request, like a remote API."""
+
+    latency: float = 0.02
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.latency)
+        return super().embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(self.latency)
+        return super().embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        await asyncio.sleep(self.latency)
+        return super().embed_documents(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        await asyncio.sleep(self.latency)
+        return super().embed_query(text)
@@ -0,0 +1,61 @@
+import random
+import textwrap
+from typing import List
+
+WORDS = (
+    "research project data model system energy health network analysis design team results "
+    "impact industry university laboratory patent publication award innovation software clinical "
+    "engineering program funding partners policy community students method evaluation prototype"
+).split()
+
+CANDIDATE_PAGE = (
+    "Recommendation questionnaire. Candidate full name: Ana Maria Ruiz. Pronouns: she/her. "
+    "Proposed initiative in the United States: a clean energy storage startup in Texas. "
+    "Recommender: Professor of Electrical Engineering who supervised the candidate for four years. "
+)
+
+
+def synthetic_pages(page_count: int, chars_per_page: int = 2500, seed: int = 0) -> List[str]:
+    """
+    Builds deterministic page texts; the first page carries the candidate's
+    name and pronouns so the local extraction path can be exercised.
+    """
+    rng = random.Random(seed)
+    pages = []
+    for page in range(page_count):
+        text = CANDIDATE_PAGE if page == 0 else ""
+        while len(text) < chars_per_page:
+            sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 18)))
+            text += sentence.capitalize() + ". "
+        pages.append(text)
+    return pages
+
+
+def write_pdf(path: str, pages: List[str]):
+    """Writes a minimal text-only PDF with one Helvetica page per entry."""
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{4 + 2 * i} 0 R' for i in range(len(pages)))}] /Count {len(pages)} >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, text in enumerate(pages):
+        lines = textwrap.wrap(text, 90)
+        escaped = (line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in lines)
+        stream = "BT /F1 9 Tf 36 806 Td 11 TL " + " ".join(f"({line}) '" for line in escaped) + " ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+
+    output = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    output += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(output)
@@ -0,0 +1,286 @@
+"""Offline benchmark of ingestion, graph turns, concurrency and per-session memory.
+
+Runs the real pipeline against deterministic stand-ins (backend/benchmarks/fakes.py)
+for OpenAI and an in-memory LocalVectorStore for Azure AI Search, so results
+depend only on this code and the configured fake latencies. Results are
+written as JSON to compare between commits:
+
+    python -m backend.benchmarks.run --output bench.json
+    python -m backend.benchmarks.run --pages 1,20,100 --repeats 10 --llm-latency 0.2
+"""
+import os
+import gc
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+from typing import List
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from backend.benchmarks.fakes import FakeChatModel, FakeEmbeddings, count_words
+from backend.benchmarks.pdfs import synthetic_pages, write_pdf
+from backend.src.agent import DocumentGenerationAgent
+from backend.src.cache import SQLiteLRUCache
+from backend.src.embedding_cache import CachedEmbeddings
+from backend.src.graph import create_graph
+from backend.src.instrumentation import TurnTrace, configure_logging
+from backend.src.llm_cache import LLMResponseCache
+from backend.src.memory import ConversationMemory
+from backend.src.nodes.translate_context_node import TranslateContextNode
+from backend.src.orchestrator import OrchestratorAgent
+from backend.src.translation import ChunkTranslator
+from backend.src.vector_stores.local import LocalVectorStore
+
+REQUIRED_INFO = [
+    "the full name of the client",
+    "the client's pronouns",
+    "details of the recommender's expertise and credentials",
+    "the professional relationship between the recommender and the client",
+    "a clear description of the client's proposed work/project in the U.S.",
+    "at least two specific examples of the client's key achievements and contributions",
+]
+
+# Turns that exercise each routing path, as (name, request, uses uploaded files, known fields).
+SCENARIOS = [
+    ("small_talk", "thanks", False, {}),
+    ("llm_router", "I would like some help with a recommendation letter for my colleague", False, {}),
+    ("retrieval_to_letter", "Please use the documents I uploaded", True, {}),
+    (
+        "fields_complete_to_letter",
+        "Generate the letter",
+        False,
+        {
+            "client_name": "Ana Maria Ruiz",
+            "client_pronouns": "she/her",
+            "client_endeavor": "A clean energy storage startup in Texas",
+            "lor_questionnaire": "Supervised the candidate for four years on grid storage research.",
+        },
+    ),
+]
+
+
+class Harness:
+    """Builds the graph and ingestion pipeline on fakes inside a scratch directory."""
+
+    def __init__(self, workdir: str, args):
+        self.workdir = workdir
+        llm = FakeChatModel(latency=args.llm_latency, tokens_per_second=args.tokens_per_second, letter_tokens=args.letter_tokens)
+        embeddings = CachedEmbeddings(
+            FakeEmbeddings(size=args.embedding_size, latency=args.embedding_latency),
+            model="fake-embeddings",
+            cache=SQLiteLRUCache(os.path.join(workdir, "embeddings.sqlite"), "embeddings", 100000),
+        )
+        translator = ChunkTranslator(llm, cache=SQLiteLRUCache(os.path.join(workdir, "translations.sqlite"), "translations", 100000))
+        # Tokens are counted as words so the run needs no tiktoken download.
+        memory = ConversationMemory(llm, token_counter=count_words)
+        response_cache = LLMResponseCache(SQLiteLRUCache(os.path.join(workdir, "llm_responses.sqlite"), "llm_responses", 100000))
+        self.agent = DocumentGenerationAgent(
+            llm=llm,
+            embeddings=embeddings,
+            vector_store=LocalVectorStore(persist=False),
+            translator=translator,
+            memory=memory,
+            response_cache=response_cache,
+            token_counter=count_words,
+        )
+        self.graph, _ = create_graph(
+            agent=self.agent,
+            translate_node=TranslateContextNode(translator=translator),
+            orchestrator=OrchestratorAgent(llm=llm, embeddings=embeddings, memory=memory, response_cache=response_cache),
+            checkpointer=MemorySaver(),
+        )
+        # As at server startup, so section query vectors are not billed to the first turn.
+        asyncio.run(self.agent.retriever.warm_up())
+
+    def pdf(self, pages: int) -> str:
+        path = os.path.join(self.workdir, f"synthetic_{pages}.pdf")
+        if not os.path.exists(path):
+            write_pdf(path, synthetic_pages(pages))
+        return path
+
+    async def aturn(self, thread_id: str, request: str, files: List[str], fields: dict) -> dict:
+        state = {
+            "request": request,
+            "thread_id": thread_id,
+            "required_info": REQUIRED_INFO,
+            "conversation_history": [f"User: {request}"],
+            "files": files,
+            **fields,
+        }
+        trace = TurnTrace()
+        started = time.perf_counter()
+        await self.graph.ainvoke(state, {"configurable": {"thread_id": thread_id}, "callbacks": [trace]})
+        latency = time.perf_counter() - started
+        values = (await self.graph.aget_state({"configurable": {"thread_id": thread_id}})).values
+        return {
+            "latency": latency,
+            "route_source": values.get("route_source"),
+            "nodes": [span["node"] for span in trace.nodes],
+            "generated": bool(values.get("generated_document")),
+        }
+
+    def turn(self, thread_id: str, request: str, files: List[str], fields: dict) -> dict:
+        return asyncio.run(self.aturn(thread_id, request, files, fields))
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def bench_ingestion(harness: Harness, page_counts: List[int]) -> List[dict]:
+    results = []
+    for pages in page_counts:
+        path = harness.pdf(pages)
+        started = time.perf_counter()
+        summary = asyncio.run(harness.agent.aprocess_pdfs([path], f"ingest-{uuid.uuid4()}"))
+        elapsed = time.perf_counter() - started
+        results.append({
+            "pages": pages,
+            "chunks": summary["added"],
+            "seconds": round(elapsed, 4),
+            "pages_per_second": round(pages / elapsed, 2),
+            "chunks_per_second": round(summary["added"] / elapsed, 2),
+        })
+    return results
+
+
+def bench_turns(harness: Harness, repeats: int, pages: int) -> dict:
+    path = harness.pdf(pages)
+    results = {}
+    for name, request, uses_files, fields in SCENARIOS:
+        latencies, samples = [], []
+        for _ in range(repeats):
+            thread_id = f"{name}-{uuid.uuid4()}"
+            files = []
+            if uses_files:
+                asyncio.run(harness.agent.aprocess_pdfs([path], thread_id))
+                files = [path]
+            sample = harness.turn(thread_id, request, files, fields)
+            latencies.append(sample["latency"])
+            samples.append(sample)
+        results[name] = {
+            "route_source": samples[-1]["route_source"],
+            "nodes": samples[-1]["nodes"],
+            "generated_document": samples[-1]["generated"],
+            "p50_seconds": round(statistics.median(latencies), 4),
+            "p95_seconds": round(_percentile(latencies, 0.95), 4),
+            "mean_seconds": round(statistics.fmean(latencies), 4),
+        }
+    return results
+
+
+def bench_concurrency(harness: Harness, levels: List[int]) -> List[dict]:
+    """
+    Turns per second when `n` sessions send an LLM-routed turn at the same
+    time on one event loop. With async nodes this grows with `n` until the
+    fakes' latency is no longer the bottleneck.
+    """
+    name, request, _, fields = SCENARIOS[1]
+
+    async def burst(n: int) -> float:
+        started = time.perf_counter()
+        await asyncio.gather(*(harness.aturn(f"{name}-{uuid.uuid4()}", request, [], fields) for _ in range(n)))
+        return time.perf_counter() - started
+
+    results = []
+    for n in levels:
+        elapsed = asyncio.run(burst(n))
+        results.append({"sessions": n, "seconds": round(elapsed, 4), "turns_per_second": round(n / elapsed, 2)})
+    return results
+
+
+def bench_session_memory(harness: Harness, sessions: int, pages: int) -> dict:
+    """
+    Peak Python heap of one full session (upload, letter from the uploaded
+    documents, small talk) and what stays allocated afterwards. PDF parsing
+    runs in worker processes and is not included.
+    """
+    path = harness.pdf(pages)
+    peaks, retained = [], []
+    for _ in range(sessions):
+        gc.collect()
+        tracemalloc.start()
+        thread_id = f"session-{uuid.uuid4()}"
+        asyncio.run(harness.agent.aprocess_pdfs([path], thread_id))
+        harness.turn(thread_id, "Please use the documents I uploaded", [path], {})
+        harness.turn(thread_id, "thanks", [path], {})
+        harness.agent.release_thread(thread_id)
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.append(peak)
+        retained.append(current)
+    return {
+        "sessions": sessions,
+        "pages": pages,
+        "peak_bytes_mean": int(statistics.fmean(peaks)),
+        "peak_bytes_max": max(peaks),
+        "retained_bytes_mean": int(statistics.fmean(retained)),
+    }
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--pages", default="1,10,50", help="Comma-separated PDF sizes for the ingestion benchmark")
+    parser.add_argument("--turn-pages", type=int, default=10, help="PDF size uploaded in the turn and memory benchmarks")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--sessions", type=int, default=3)
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated numbers of simultaneous sessions")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds before a fake model's first token")
+    parser.add_argument("--tokens-per-second", type=float, default=500.0)
+    parser.add_argument("--letter-tokens", type=int, default=300)
+    parser.add_argument("--embedding-latency", type=float, default=0.02, help="Seconds per fake embedding request")
+    parser.add_argument("--embedding-size", type=int, default=256)
+    parser.add_argument(
+        "--response-cache", action="store_true", help="Let repeated turns hit the model response cache, as in production"
+    )
+    args = parser.parse_args()
+
+    if not args.response_cache:
+        # Every repeat of a scenario builds the same prompt; measure the model path instead of cache hits.
+        os.environ["LLM_CACHE_NODES"] = ""
+
+    # Per-call pipeline logs would dominate the output; LOG_LEVEL still overrides.
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    configure_logging()
+
+    with tempfile.TemporaryDirectory(prefix="lor-bench-") as workdir:
+        harness = Harness(workdir, args)
+        # Starts the PDF parse pool so process spawn time is not billed to the first size.
+        bench_ingestion(harness, [1])
+        results = {
+            "commit": _commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "config": vars(args),
+            "ingestion": bench_ingestion(harness, [int(pages) for pages in args.pages.split(",")]),
+            "turns": bench_turns(harness, args.repeats, args.turn_pages),
+            "concurrency": bench_concurrency(harness, [int(n) for n in args.concurrency.split(",")]),
+            "session_memory": bench_session_memory(harness, args.sessions, args.turn_pages),
+        }
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
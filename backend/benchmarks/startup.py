@@ -0,0 +1,160 @@
+"""Cold start benchmark of the FastAPI entry point: import profile and time to first request.
+
+Import profile: each module in `--modules` is imported in a fresh interpreter
+with `-X importtime`, and the total and the slowest packages are reported.
+
+Time to first request: uvicorn is started in a fresh process and `/health`
+is polled. The time to the first answer is compared with `--target-seconds`,
+and polling continues until the background startup reports `ready` (or an
+error, e.g. without OpenAI or Azure credentials) or `--ready-timeout`
+passes. The process exits with status 1 when the target is missed.
+
+    python -m backend.benchmarks.startup --output startup.json
+    VECTOR_STORE_BACKEND=local python -m backend.benchmarks.startup --target-seconds 1.5
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import platform
+import tempfile
+import subprocess
+from typing import Dict
+
+import httpx
+
+from backend.benchmarks.run import _commit
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, env.get("PYTHONPATH")]))
+    return env
+
+
+def import_profile(module: str, top: int) -> dict:
+    """
+    Imports `module` in a fresh interpreter with `-X importtime`.
+
+    Returns:
+        dict: Wall time of the interpreter, the summed time of top-level
+        imports, and the `top` slowest packages including what they import
+    """
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=_env(), cwd=tempfile.gettempdir(),
+    )
+    wall = time.perf_counter() - started
+    if completed.returncode != 0:
+        return {"module": module, "error": completed.stderr.strip().splitlines()[-1:]}
+
+    entries = []
+    for line in completed.stderr.splitlines():
+        if line.startswith("import time:") and "self [us]" not in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            entries.append(((len(name) - len(name.lstrip()) - 1) // 2, name.strip().split(".")[0], int(cumulative)))
+
+    # importtime prints children before their parent; walked in reverse, each
+    # package is charged once where it is first entered from another package.
+    total_us = sum(cumulative for depth, _, cumulative in entries if depth == 0)
+    packages: Dict[str, int] = {}
+    stack = []
+    for depth, package, cumulative in reversed(entries):
+        while stack and stack[-1][0] >= depth:
+            stack.pop()
+        if not stack or stack[-1][1] != package:
+            packages[package] = packages.get(package, 0) + cumulative
+        stack.append((depth, package))
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "module": module,
+        "wall_seconds": round(wall, 4),
+        "import_seconds": round(total_us / 1e6, 4),
+        "slowest_packages": [{"package": name, "seconds": round(us / 1e6, 4)} for name, us in slowest],
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_first_request(app: str, ready_timeout: float) -> dict:
+    """
+    Starts `app` under uvicorn and polls `/health`.
+
+    Returns:
+        dict: Seconds until the first answer, seconds until startup reported
+        `ready`, and the last health payload
+    """
+    port = _free_port()
+    with tempfile.TemporaryDirectory(prefix="lor-startup-") as workdir:
+        started = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", app, "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+            env=_env(), cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        first_request, ready, health = None, None, None
+        try:
+            with httpx.Client(timeout=1.0) as client:
+                while time.perf_counter() - started < ready_timeout and server.poll() is None:
+                    try:
+                        health = client.get(f"http://127.0.0.1:{port}/health").json()
+                    except httpx.TransportError:
+                        time.sleep(0.01)
+                        continue
+                    if first_request is None:
+                        first_request = time.perf_counter() - started
+                    if health.get("ready") or health.get("error"):
+                        ready = time.perf_counter() - started if health.get("ready") else None
+                        break
+                    time.sleep(0.05)
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+    return {
+        "first_request_seconds": round(first_request, 4) if first_request is not None else None,
+        "ready_seconds": round(ready, 4) if ready is not None else None,
+        "health": health,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="startup_results.json")
+    parser.add_argument("--app", default="backend.src.main:app")
+    parser.add_argument(
+        "--modules", default="backend.src.main,backend.src.graph",
+        help="Comma-separated modules to profile; the graph shows what the entry point no longer loads up front",
+    )
+    parser.add_argument("--top", type=int, default=10, help="Slowest packages listed per module")
+    parser.add_argument("--target-seconds", type=float, default=2.0, help="Target time from process start to the first answered request")
+    parser.add_argument("--ready-timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    startup = time_to_first_request(args.app, args.ready_timeout)
+    first_request = startup["first_request_seconds"]
+    results = {
+        "commit": _commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "config": vars(args),
+        "imports": [import_profile(module, args.top) for module in args.modules.split(",")],
+        "startup": startup,
+        "target_met": first_request is not None and first_request <= args.target_seconds,
+    }
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+    sys.exit(0 if results["target_met"] else 1)
+
+
+if __name__ == "__main__":
+    main()
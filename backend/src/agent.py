@@ -1,210 +1,181 @@
+import logging
 import os
 import time
-import uuid
 import json
-from langchain_community.document_loaders import PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-from langchain_community.vectorstores.azuresearch import AzureSearch
-from azure.search.documents.indexes.models import (
-    SearchableField,
-    SearchField,
-    SearchFieldDataType,
-    SimpleField,
-    SearchIndex,
-    VectorSearch,
-    VectorSearchProfile,
-    HnswAlgorithmConfiguration,
-)
-from azure.search.documents.models import VectorizedQuery
-
-
-from dotenv import load_dotenv
+import asyncio
+from typing import Dict
 
 from openai import BadRequestError
 from backend.src.schemas import GraphState
+from backend.src.ingestion import PDFIngestionPipeline
+from backend.src.recent_chunks import RecentChunkBuffer
+from backend.src.retrieval import MultiQueryRetriever
+from backend.src.context_assembly import ContextAssembler
+from backend.src.extraction import extract_client_fields
+from backend.src.clients import get_chat_model, get_conversation_memory, get_embeddings, get_llm_cache, get_translator, get_vector_store
+from backend.src.llm_cache import NodeModels
+from backend.src.rate_limit import BACKGROUND, priority
 from backend.src.output_schemas import ContextCompleteness, ConversationResponse
 from backend.src.prompts import PromptFactory
 from backend.src.prompts.utils import truncate_conversation_history
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
 class DocumentGenerationAgent:
-    def __init__(self):
-        openai_api_key = os.getenv("OPENAI_API_KEY")
-        if not openai_api_key:
-            raise ValueError("OPENAI_API_KEY environment variable not set.")
-            
-        self.llm = ChatOpenAI(openai_api_key=openai_api_key, model_name="gpt-5-2025-08-07")
-        self.embeddings = OpenAIEmbeddings(openai_api_key=openai_api_key, model="text-embedding-3-large")
-
-        fields = [
-            SimpleField(
-                name="id",
-                type=SearchFieldDataType.String,
-                key=True,
-                filterable=True,
-                retrievable=True,
-            ),
-            SearchableField(
-                name="content",
-                type=SearchFieldDataType.String,
-                searchable=True,
-                retrievable=True,
-            ),
-            SearchableField(
-                name="metadata",
-                type=SearchFieldDataType.String,
-                searchable=True,
-                retrievable=True,
-            ),
-            SearchField(
-                name="content_vector",
-                type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
-                searchable=True,
-                vector_search_dimensions=3072,
-                vector_search_profile_name="my-vector-search-profile",
-            ),
-            SimpleField(
-                name="thread_id",
-                type=SearchFieldDataType.String,
-                filterable=True,
-                searchable=True,
-            ),
-        ]
-        
-        vector_search = VectorSearch(
-            profiles=[VectorSearchProfile(name="my-vector-search-profile", algorithm_configuration_name="my-algorithms-config")],
-            algorithms=[HnswAlgorithmConfiguration(name="my-algorithms-config")],
-        )
-        
-        index = SearchIndex(name=os.getenv("AZURE_SEARCH_INDEX"), fields=fields, vector_search=vector_search)
-        
-        from azure.search.documents.indexes import SearchIndexClient
-        from azure.core.credentials import AzureKeyCredential
-        
-        index_client = SearchIndexClient(
-            endpoint=os.getenv("AZURE_SEARCH_ENDPOINT"),
-            credential=AzureKeyCredential(os.getenv("AZURE_SEARCH_KEY")),
-        )
-        if os.getenv("AZURE_SEARCH_INDEX") not in index_client.list_index_names():
-            index_client.create_index(index)
-            print(f"Index '{os.getenv('AZURE_SEARCH_INDEX')}' created.")
-        else:
-            print(f"Index '{os.getenv('AZURE_SEARCH_INDEX')}' already exists.")
-
-        self.vector_store = AzureSearch(
-            azure_search_endpoint=os.getenv("AZURE_SEARCH_ENDPOINT"),
-            azure_search_key=os.getenv("AZURE_SEARCH_KEY"),
-            index_name=os.getenv("AZURE_SEARCH_INDEX"),
-            embedding_function=self.embeddings.embed_query,
+    def __init__(
+        self, llm=None, embeddings=None, vector_store=None, translator=None, memory=None, response_cache=None, token_counter=None
+    ):
+        """
+        Clients default to the shared process-wide instances from
+        `backend.src.clients`; pass them explicitly to run against other backends.
+        Tokens are counted with tiktoken unless a `token_counter` is given.
+        """
+        self.llm = llm or get_chat_model()
+        self.models = NodeModels(self.llm, response_cache or get_llm_cache())
+        self.embeddings = embeddings or get_embeddings()
+        self.vector_store = vector_store or get_vector_store()
+        self.memory = memory or get_conversation_memory()
+        self.recent_chunks = RecentChunkBuffer()
+        self.retriever = MultiQueryRetriever(self.embeddings, self.vector_store, recent_chunks=self.recent_chunks)
+        self.assembler = ContextAssembler(self.embeddings, token_counter=token_counter)
+        if translator is None and os.getenv("INGEST_TIME_TRANSLATION", "true").lower() in ("1", "true", "yes"):
+            translator = get_translator()
+        self.ingestion = PDFIngestionPipeline(
+            self.embeddings, self.vector_store, recent_chunks=self.recent_chunks, translator=translator, token_counter=token_counter
         )
         self.prompt_factory = PromptFactory()
+        self.ingestion_wait_seconds = float(os.getenv("INGESTION_WAIT_SECONDS", "15"))
+        # Threads with documents queued or being ingested, set once their first
+        # batch is searchable or ingestion ends.
+        self._ingestions: Dict[str, asyncio.Event] = {}
 
-    def process_pdfs(self, file_paths, thread_id: str):
+    def expect_ingestion(self, thread_id: str):
         """
-        Loads and chunks PDFs, generates embeddings, and stores them in a
-        thread-specific namespace in Pinecone.
+        Marks a thread as having documents on their way into the index, so
+        retrieval for it waits until the first batch is stored or
+        `end_ingestion`. Call it before queueing the documents; `aprocess_pdfs`
+        ends it when it returns.
         """
-        all_docs = []
-        for file_path in file_paths:
-            loader = PyPDFLoader(file_path)
-            documents = loader.load()
-            text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-            docs = text_splitter.split_documents(documents)
-            
-            for doc in docs:
-                doc.metadata = {"thread_id": thread_id}
+        self._ingestions.setdefault(thread_id, asyncio.Event())
 
-            all_docs.extend(docs)
-        
-        if all_docs:
-            batch_size = 10
-            batches = [all_docs[i:i + batch_size] for i in range(0, len(all_docs), batch_size)]
-            
-            for batch in batches:
-                texts = [doc.page_content for doc in batch]
-                embeddings = self.embeddings.embed_documents(texts)
-                
-                documents_to_upload = []
-                for i, doc in enumerate(batch):
-                    documents_to_upload.append(
-                        {
-                            "id": str(uuid.uuid4()),
-                            "content": texts[i],
-                            "content_vector": embeddings[i],
-                            "thread_id": doc.metadata["thread_id"],
-                            "metadata": json.dumps(doc.metadata),
-                        }
-                    )
-                
-                self.vector_store.client.upload_documents(documents=documents_to_upload)
-                print(f"Processed batch of {len(batch)} documents.")
+    def end_ingestion(self, thread_id: str):
+        event = self._ingestions.pop(thread_id, None)
+        if event is not None:
+            event.set()
 
-            print(f"Documents have been processed and stored in Azure AI Search for thread: {thread_id}")
-        else:
-            print("No documents to process.")
+    def _batch_stored(self, thread_id: str):
+        event = self._ingestions.get(thread_id)
+        if event is not None:
+            event.set()
 
-    def retrieve_context(self, state: GraphState):
+    async def wait_for_first_batch(self, thread_id: str, timeout: float | None = None) -> bool:
         """
-        Retrieves relevant context from a thread-specific Pinecone namespace.
-        It includes a retry mechanism to account for indexing delays.
+        Waits until the first batch of the thread's queued documents is
+        searchable, or until it has no documents left to ingest.
+
+        Returns:
+            bool: False when `timeout` seconds passed first
         """
-        print("---RETRIEVING CONTEXT---")
-        request = state["request"]
-        thread_id = state["thread_id"]
-        conversation_history = state.get("conversation_history", [])
-        
-        history_str = "\n".join(conversation_history)
-        retrieval_query = self.prompt_factory.get_prompt("retrieval_query")
-        detailed_query = f"User Request: {request}\n\nConversation History:\n{history_str}\n\n{retrieval_query}"
-        
-        vector_query = VectorizedQuery(
-            vector=self.embeddings.embed_query(detailed_query),
-            k_nearest_neighbors=5,
-            fields="content_vector",
-        )
+        event = self._ingestions.get(thread_id)
+        if event is None:
+            return True
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
 
-        context = []
-        for i in range(3):
-            results = self.vector_store.client.search(
-                search_text=detailed_query,
-                vector_queries=[vector_query],
-                filter=f"thread_id eq '{thread_id}'",
-                select=["content", "metadata"],
-            )
-            context = []
-            for result in results:
-                metadata = json.loads(result.get("metadata", "{}"))
-                context.append({
-                    "page_content": result["content"],
-                    "metadata": metadata
-                })
-            if context:
-                print(f"Context retrieved successfully on attempt {i+1}.")
-                break
-            print(f"Attempt {i+1}: Context is empty, retrying in 1 second...")
-            time.sleep(1 + i * 2)
+    async def aprocess_pdfs(self, file_paths, thread_id: str, on_progress=None):
+        """
+        Loads and chunks PDFs, generates embeddings, and stores them in the
+        thread-specific partition of the vector store without blocking the
+        event loop.
+
+        Args:
+            file_paths: Paths of the uploaded PDFs
+            thread_id: The conversation thread the documents belong to
+            on_progress: Optional coroutine receiving per-batch status lines
+
+        Returns:
+            dict: Counts of chunks added, skipped as unchanged and removed as stale
+        """
+        self.expect_ingestion(thread_id)
+        try:
+            # Embedding and translation calls yield to interactive turns under the shared rate limits.
+            with priority(BACKGROUND):
+                processed = await self.ingestion.run(
+                    file_paths, thread_id, on_progress=on_progress, on_batch=lambda: self._batch_stored(thread_id)
+                )
+        finally:
+            self.end_ingestion(thread_id)
+        logger.info("Embedding cache stats: %s", self.embeddings.stats())
+        return processed
+
+    def release_thread(self, thread_id: str):
+        """
+        Drops what is held in memory for a thread whose session ended. The
+        indexed chunks and the checkpointed conversation are kept.
+        """
+        self.recent_chunks.drop(thread_id)
+        self.vector_store.release(thread_id)
 
-        print("retrieved context: ", context)
-        return {"retrieved_context": context}
+    async def retrieve_context(self, state: GraphState):
+        """
+        Retrieves relevant context for the thread with one focused search per
+        section of the letter, fused by rank. Chunks ingested recently in this
+        process are searched alongside the index, so the retry with a delay
+        only happens when both sources come back empty. The candidates are
+        narrowed to a diverse set and overlapping neighbours merged before
+        anything is translated or put in a prompt. When the thread's uploads
+        are still being ingested in the background, the search waits for
+        their first batch, up to `INGESTION_WAIT_SECONDS`, and reads whatever
+        has landed by then rather than waiting for every document.
+        """
+        logger.info("---RETRIEVING CONTEXT---")
+        started = time.perf_counter()
+        if not await self.wait_for_first_batch(state["thread_id"], self.ingestion_wait_seconds):
+            logger.warning(
+                f"No batch of thread {state['thread_id']}'s documents was stored within "
+                f"{self.ingestion_wait_seconds:.0f}s, retrieving from what is indexed so far"
+            )
+        elif time.perf_counter() - started > 0.01:
+            logger.info(f"Waited {time.perf_counter() - started:.2f}s for the first batch of the thread's documents")
+        history_str = self.memory.render(state, "retrieve_context")
+        candidates = await self.retriever.retrieve(state["thread_id"], state["request"], history_str)
+        context, tokens_saved = await self.assembler.assemble(candidates)
+        logger.debug("Retrieved context: %s", context)
+        return {"retrieved_context": context, "context_tokens_saved": tokens_saved}
 
 
-    def context_completeness_check(self, state: GraphState):
+    async def context_completeness_check(self, state: GraphState):
         """
         Checks if the context is complete and generates a follow-up question if needed.
+        The client's name and pronouns are first looked for locally in the context
+        and the conversation; when both are known the model is not called.
         """
-        print("---CHECKING CONTEXT COMPLETENESS---")
+        logger.info("---CHECKING CONTEXT COMPLETENESS---")
         state["missing_fields"] = []
         request = state["request"]
-        conversation_history = state.get("conversation_history", [])
+        history_str = self.memory.render(state, "context_completeness_check")
         
         if not state.get("retrieved_context"):
-            context = "\n".join(conversation_history)
+            context = history_str
         else:
             context = state["translated_context"]
 
-        history_str = "\n".join(conversation_history)
+        if not (state.get("client_name") and state.get("client_pronouns")):
+            text = "\n".join([state.get("translated_context") or "", *(state.get("conversation_history") or []), state.get("user_provided_info") or ""])
+            for field, value in extract_client_fields(text).items():
+                if not state.get(field):
+                    state[field] = value
+                    logger.info(f"Extracted {field} locally: {value}")
+
+        if state.get("client_name") and state.get("client_pronouns"):
+            logger.info("---CLIENT NAME AND PRONOUNS KNOWN, SKIPPING LLM CHECK---")
+            state["follow_up_question"] = ""
+            if not state.get("retrieved_context"):
+                state["translated_context"] = context
+            return state
         
         client_name = state.get("client_name", "Not provided")
         client_pronouns = state.get("client_pronouns", "Not provided")
@@ -223,20 +194,20 @@ class DocumentGenerationAgent:
             client_endeavor=client_endeavor
         )
         
-        print("---CURRENT STATE VALUES---")
-        print(f"Client Name: {state.get('client_name', '')}")
-        print(f"Client Pronouns: {state.get('client_pronouns', '')}")
-        print(f"Client Endeavor: {state.get('client_endeavor', '')}")
-        print(f"Client Gender: {state.get('client_gender', '')}")
+        logger.debug("---CURRENT STATE VALUES---")
+        logger.debug(f"Client Name: {state.get('client_name', '')}")
+        logger.debug(f"Client Pronouns: {state.get('client_pronouns', '')}")
+        logger.debug(f"Client Endeavor: {state.get('client_endeavor', '')}")
+        logger.debug(f"Client Gender: {state.get('client_gender', '')}")
         
-        structured_llm = self.llm.with_structured_output(ContextCompleteness)
-        response = structured_llm.invoke(prompt)
+        structured_llm = self.models.for_node("context_completeness_check").with_structured_output(ContextCompleteness)
+        response = await structured_llm.ainvoke(prompt)
         
-        print("---CONTEXT COMPLETENESS RESPONSE---", response)
+        logger.debug("---CONTEXT COMPLETENESS RESPONSE--- %s", response)
         
         if response.missing_fields:
             if not response.follow_up_question:
-                print("---FALLBACK IN CASE THE LLM FAILS TO GENERATE A QUESTION---")
+                logger.warning("---FALLBACK IN CASE THE LLM FAILS TO GENERATE A QUESTION---")
                 missing_fields_str = ", ".join(response.missing_fields)
                 response.follow_up_question = f"It looks like I'm missing some information. Could you please provide the following details: {missing_fields_str}?"
             
@@ -249,84 +220,92 @@ class DocumentGenerationAgent:
                 state["translated_context"] = context
         return state
 
-    def generate_document(self, state: GraphState):
+    async def generate_document(self, state: GraphState):
         """
-        Generates a document by building a detailed prompt and invoking the LLM.
+        Generates a document by building a detailed prompt and streaming the
+        LLM's response. When the graph runs with `stream_mode="messages"` the
+        tokens are forwarded to the caller as they arrive.
         """
-        print("---GENERATING DOCUMENT---")
+        logger.info("---GENERATING DOCUMENT---")
         context = state["translated_context"]
-        conversation_history = state.get("conversation_history", [])
-
-        history_str = "\n".join(conversation_history)
+        history_str = self.memory.render(state, "generate_document")
         full_context = f"Retrieved Context: {context}\n\nConversation History:\n{history_str}"
         
         lor_system_prompt = self.prompt_factory.get_prompt("lor_system", full_context)
 
-        print("---CALLING LLM WITH DETAILED LOR PROMPT---")
-        generated_doc = self.llm.invoke(lor_system_prompt)
-        print("generated_doc: ", generated_doc)
-        state["generated_document"] = generated_doc.content
+        logger.info("---CALLING LLM WITH DETAILED LOR PROMPT---")
+        started = time.perf_counter()
+        generated_doc = None
+        async for chunk in self.models.for_node("generate_document").astream(lor_system_prompt):
+            if generated_doc is None:
+                logger.info(f"Time to first token: {time.perf_counter() - started:.2f}s")
+                generated_doc = chunk
+            else:
+                generated_doc += chunk
+        logger.info(f"Document generated in {time.perf_counter() - started:.2f}s")
+        logger.debug("Generated document: %s", generated_doc)
+        state["generated_document"] = generated_doc.content if generated_doc is not None else ""
         return state
         
-    def request_user_info(self, state: GraphState):
+    async def request_user_info(self, state: GraphState):
         """
         If information is missing, this node is called.
         It signals that the graph should pause to wait for user input.
         """
-        print("---REQUESTING USER INFO---")
+        logger.info("---REQUESTING USER INFO---")
         return {}
 
-    def context_gatherer_agent(self, state: GraphState):
+    async def context_gatherer_agent(self, state: GraphState):
         """
         Handles the conversational flow, responding to user queries and maintaining context.
         Uses LLM to extract information and generate appropriate responses.
         """
-        print("---CONTEXT GATHERER AGENT---")
+        logger.info("---CONTEXT GATHERER AGENT---")
         state["missing_fields"] = []
         request = state["request"]
         conversation_history = state.get("conversation_history", [])
         
         try:
-            history_str = truncate_conversation_history(conversation_history)
+            history_str = self.memory.render(state, "context_gatherer_agent")
             conversational_prompt = self.prompt_factory.get_prompt("conversation", request, conversation_history=history_str)
             
-            structured_llm = self.llm.with_structured_output(ConversationResponse)
-            response = structured_llm.invoke(conversational_prompt)
+            structured_llm = self.models.for_node("context_gatherer_agent").with_structured_output(ConversationResponse)
+            response = await structured_llm.ainvoke(conversational_prompt)
             
-            print("---EXTRACTED INFORMATION---")
+            logger.debug("---EXTRACTED INFORMATION---")
             
             for field in ["client_name", "client_pronouns", "client_endeavor", "lor_questionnaire"]:
                 value = getattr(response, field, "")
                 if value:  # Only update if value is non-empty
                     state[field] = value
-                    print(f"Updated {field}: {value}")
+                    logger.info(f"Updated {field}: {value}")
             
             state["conversational_response"] = response.response
-            print("conversational_response:", response.response)
+            logger.debug("Conversational response: %s", response.response)
             
-            print("\n---FINAL STATE AFTER UPDATES---")
-            print(f"Client Name: {state.get('client_name', '')}")
-            print(f"Client Pronouns: {state.get('client_pronouns', '')}")
-            print(f"Client Endeavor: {state.get('client_endeavor', '')}")
-            print(f"LOR Questionnaire: {state.get('lor_questionnaire', '')}")
+            logger.debug("---FINAL STATE AFTER UPDATES---")
+            logger.debug(f"Client Name: {state.get('client_name', '')}")
+            logger.debug(f"Client Pronouns: {state.get('client_pronouns', '')}")
+            logger.debug(f"Client Endeavor: {state.get('client_endeavor', '')}")
+            logger.debug(f"LOR Questionnaire: {state.get('lor_questionnaire', '')}")
             
             return state
             
         except BadRequestError as e:
             if "context_length_exceeded" in str(e):
-                print("Context length exceeded, retrying with minimal history...")
+                logger.warning("Context length exceeded, retrying with minimal history...")
                 history_str = truncate_conversation_history(conversation_history, max_messages=3)
                 conversational_prompt = self.prompt_factory.get_prompt("conversation", request, conversation_history=history_str)
                 
-                structured_llm = self.llm.with_structured_output(ConversationResponse)
-                response = structured_llm.invoke(conversational_prompt)
+                structured_llm = self.models.for_node("context_gatherer_agent").with_structured_output(ConversationResponse)
+                response = await structured_llm.ainvoke(conversational_prompt)
                 
                 for key, value in response.extracted_info.items():
                     if value is not None:
                         state[key] = value
-                        print(f"Updated {key}: {value}")
+                        logger.info(f"Updated {key}: {value}")
                 
                 state["conversational_response"] = response.response
-                print("conversational_response: ", response.response)
+                logger.debug("Conversational response: %s", response.response)
                 return state
             raise
\ No newline at end of file
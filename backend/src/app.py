@@ -6,17 +6,36 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+import logging
+
 import chainlit as cl
-from backend.src.graph import create_graph
+from backend.src import startup
+from backend.src.instrumentation import TurnTrace, configure_logging
+
+configure_logging()
+logger = logging.getLogger(__name__)
 
 UPLOAD_DIR = os.path.join(project_root, "backend", "uploaded_pdfs")
 if not os.path.exists(UPLOAD_DIR):
     os.makedirs(UPLOAD_DIR)
 
+@cl.on_app_startup
+async def on_app_startup():
+    # Builds the graph, provisions the search index and embeds the section
+    # queries in the background, so the UI is served before they are loaded.
+    startup.start()
+
+
+@cl.on_app_shutdown
+async def on_app_shutdown():
+    # Closes the search clients opened by the retriever.
+    await startup.shutdown()
+
+
 @cl.on_chat_start
 async def on_chat_start():
     try:
-        app, agent = create_graph()
+        app, agent = await startup.ready()
         cl.user_session.set("graph", app)
         cl.user_session.set("agent", agent)
         cl.user_session.set("conversation_history", [])
@@ -29,6 +48,14 @@ async def on_chat_start():
         await cl.Message(content=f"An error occurred: {e}").send()
 
 
+@cl.on_chat_end
+async def on_chat_end():
+    agent = cl.user_session.get("agent")
+    thread_id = cl.user_session.get("thread_id")
+    if agent and thread_id:
+        agent.release_thread(thread_id)
+
+
 @cl.on_message
 async def on_message(message: cl.Message):
     agent = cl.user_session.get("agent")
@@ -60,7 +87,11 @@ async def on_message(message: cl.Message):
                         await cl.Message(content=f"Could not read content of file {file.name}.").send()
 
                 await step.stream_token("\nAnalyzing PDF contents...")
-                agent.process_pdfs(file_paths, thread_id)
+
+                async def report_progress(status: str):
+                    await step.stream_token(f"\n{status}")
+
+                await agent.aprocess_pdfs(file_paths, thread_id, on_progress=report_progress)
                 
                 uploaded_files = cl.user_session.get("uploaded_files")
                 uploaded_files.extend(file_paths)
@@ -90,8 +121,20 @@ async def on_message(message: cl.Message):
         step.input = message.content
         await step.stream_token("Analyzing your request...")
         
-        async for _ in graph.astream(initial_input, config):
-            await step.stream_token(".")
+        letter_message = None
+        trace = TurnTrace()
+        async for mode, payload in graph.astream(initial_input, {**config, "callbacks": [trace]}, stream_mode=["updates", "messages"]):
+            if mode == "messages":
+                chunk, metadata = payload
+                if metadata.get("langgraph_node") == "generate_document" and isinstance(chunk.content, str) and chunk.content:
+                    if letter_message is None:
+                        letter_message = cl.Message(content="Here is the generated document:\n\n")
+                    await letter_message.stream_token(chunk.content)
+            else:
+                await step.stream_token(".")
+
+        async with cl.Step(name="Trace", type="tool") as trace_step:
+            trace_step.output = trace.summary()
         
         final_state = await graph.aget_state(config)
         
@@ -101,7 +144,7 @@ async def on_message(message: cl.Message):
             return
 
         if final_state.values.get('missing_fields'):
-            print("---MISSING FIELDS---", final_state.values.get('missing_fields'))
+            logger.info("---MISSING FIELDS--- %s", final_state.values.get('missing_fields'))
             follow_up = final_state.values.get('follow_up_question')
             if follow_up:
                 step.output = "Additional information needed"
@@ -118,10 +161,13 @@ async def on_message(message: cl.Message):
 
             response = "Here is the generated document:"
             conversation_history.append(f"AI: {response}")
-            await cl.Message(
-                content=f"{response}\n\n{doc}",
-                elements=[cl.File(name="generated_document.txt", content=doc.encode(), display="inline")]
-            ).send()
+            document_file = cl.File(name="generated_document.txt", content=doc.encode(), display="inline")
+            if letter_message is not None:
+                letter_message.content = f"{response}\n\n{doc}"
+                letter_message.elements = [document_file]
+                await letter_message.send()
+            else:
+                await cl.Message(content=f"{response}\n\n{doc}", elements=[document_file]).send()
             return
 
         if final_state.values.get('conversational_response'):
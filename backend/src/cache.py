@@ -0,0 +1,100 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, Iterable, Optional
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cache")
+
+
+class SQLiteLRUCache:
+    """A small key/value store on a local SQLite file with LRU eviction.
+
+    Every read refreshes the entry's access time, and once the table grows
+    past `max_entries` the least recently used rows are deleted. Hit and miss
+    counters are kept per instance so callers can report cache effectiveness.
+    """
+
+    def __init__(self, path: str, table: str, max_entries: int):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.table = table
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} "
+            "(key TEXT PRIMARY KEY, value BLOB NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_last_access ON {table} (last_access)")
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """Returns the cached values for the given keys, skipping misses."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            # SQLite limits the number of bound parameters per statement.
+            for i in range(0, len(keys), 500):
+                part = keys[i:i + 500]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM {self.table} WHERE key IN ({placeholders})", part
+                ).fetchall()
+                found.update(rows)
+                if rows:
+                    self._conn.execute(
+                        f"UPDATE {self.table} SET last_access = ? WHERE key IN ({','.join('?' * len(rows))})",
+                        [time.time(), *[key for key, _ in rows]],
+                    )
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_many([key]).get(key)
+
+    def set_many(self, items: Dict[str, bytes]):
+        """Stores the given values and evicts the least recently used entries over the cap."""
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, last_access) VALUES (?, ?, ?)",
+                [(key, value, now) for key, value in items.items()],
+            )
+            self._evict()
+
+    def set(self, key: str, value: bytes):
+        self.set_many({key: value})
+
+    def _evict(self):
+        (count,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            (count,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": count,
+            "max_entries": self.max_entries,
+        }
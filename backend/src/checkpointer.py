@@ -0,0 +1,173 @@
+import logging
+import os
+import time
+import asyncio
+import sqlite3
+from typing import Any, AsyncIterator, Mapping, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from backend.src.cache import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteCheckpointSaver(SqliteSaver):
+    """LangGraph's `SqliteSaver` on a local file, with bounded growth.
+
+    After each checkpoint only the latest `max_checkpoints_per_thread` of its
+    thread namespace are kept, along with their pending writes, which is all
+    that resuming an interrupted run needs. Threads not written to for
+    `ttl_seconds` are deleted entirely; the sweep runs on writes at most once
+    per `sweep_interval_seconds`, and freed pages are returned to the file so
+    disk usage stays flat under sustained load.
+
+    The graph is compiled in a worker thread and driven from more than one
+    event loop, so the async methods run the sync ones in a worker thread
+    instead of binding an `AsyncSqliteSaver` connection to a single loop.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_checkpoints_per_thread: int | None = None,
+        ttl_seconds: float | None = None,
+        sweep_interval_seconds: float = 60.0,
+    ):
+        path = path or os.getenv("CHECKPOINT_DB_PATH", os.path.join(CACHE_DIR, "checkpoints.sqlite"))
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        super().__init__(sqlite3.connect(path, check_same_thread=False))
+
+        self.max_checkpoints_per_thread = max(1, max_checkpoints_per_thread or int(os.getenv("CHECKPOINT_MAX_PER_THREAD", "10")))
+        self.ttl_seconds = ttl_seconds or float(os.getenv("SESSION_TTL_SECONDS", "86400"))
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._last_sweep = 0.0
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        # auto_vacuum only takes effect when set before the first table is created.
+        self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        super().setup()
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS threads (
+                thread_id TEXT PRIMARY KEY,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS threads_updated_at ON threads (updated_at);
+            """
+        )
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self.cursor() as cur:
+            cur.execute("INSERT OR REPLACE INTO threads VALUES (?, ?)", (thread_id, time.time()))
+            self._trim(cur, thread_id, checkpoint_ns, self.max_checkpoints_per_thread)
+        self._maybe_sweep()
+        return saved
+
+    @staticmethod
+    def _trim(cur: sqlite3.Cursor, thread_id: str, checkpoint_ns: str, keep: int):
+        # Checkpoint ids are time-ordered UUIDs, so the newest sort last.
+        stale = cur.execute(
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+            "ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?",
+            (thread_id, checkpoint_ns, keep),
+        ).fetchall()
+        if stale:
+            params = [(thread_id, checkpoint_ns, checkpoint_id) for (checkpoint_id,) in stale]
+            cur.executemany("DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", params)
+            cur.executemany("DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", params)
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.execute("DELETE FROM threads WHERE thread_id = ?", (str(thread_id),))
+
+    def evict_idle(self) -> list:
+        """
+        Deletes every thread that has not been written to within the TTL.
+
+        Returns:
+            list: The evicted thread ids
+        """
+        cutoff = time.time() - self.ttl_seconds
+        with self.cursor() as cur:
+            idle = [thread_id for (thread_id,) in cur.execute(
+                "SELECT thread_id FROM threads WHERE updated_at < ?", (cutoff,)
+            ).fetchall()]
+            for table in ("checkpoints", "writes", "threads"):
+                cur.executemany(f"DELETE FROM {table} WHERE thread_id = ?", [(thread_id,) for thread_id in idle])
+        if idle:
+            with self.cursor() as cur:
+                cur.execute("PRAGMA incremental_vacuum").fetchall()
+        return idle
+
+    def _maybe_sweep(self):
+        now = time.time()
+        if now - self._last_sweep >= self.sweep_interval_seconds:
+            self._last_sweep = now
+            evicted = self.evict_idle()
+            if evicted:
+                logger.info(f"Evicted {len(evicted)} idle threads from the checkpointer")
+
+    def stats(self) -> dict:
+        with self.cursor(transaction=False) as cur:
+            (threads,) = cur.execute("SELECT COUNT(*) FROM threads").fetchone()
+            (checkpoints,) = cur.execute("SELECT COUNT(*) FROM checkpoints").fetchone()
+            (writes,) = cur.execute("SELECT COUNT(*) FROM writes").fetchone()
+        return {"threads": threads, "checkpoints": checkpoints, "writes": writes}
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        checkpoint_tuples = await asyncio.to_thread(
+            lambda: [*self.list(config, filter=filter, before=before, limit=limit)]
+        )
+        for checkpoint_tuple in checkpoint_tuples:
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return await asyncio.to_thread(self.delete_thread, thread_id)
+
+    async def aget_delta_channel_history(self, *, config: RunnableConfig, channels: Sequence[str]) -> Mapping[str, Any]:
+        return await asyncio.to_thread(lambda: self.get_delta_channel_history(config=config, channels=channels))
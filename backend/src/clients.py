@@ -0,0 +1,130 @@
+"""Process-wide model and search clients.
+
+Every graph node and the ingestion pipeline share these instances, so their
+HTTP connection pools, caches and search index handles are created once per
+process instead of once per chat session, and every OpenAI request passes
+the same rate limit governor.
+"""
+import os
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from dotenv import load_dotenv
+
+from backend.src.embedding_cache import CachedEmbeddings
+from backend.src.memory import ConversationMemory
+from backend.src.instrumentation import CACHE_STATS, ModelCallMetrics
+from backend.src.llm_cache import LLMResponseCache
+from backend.src.rate_limit import AsyncGovernedTransport, GovernedTransport, RateLimitGovernor
+from backend.src.translation import ChunkTranslator
+from backend.src.vector_stores import VectorStore, create_vector_store
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+load_dotenv()
+
+GENERATION_MODEL_NAME = "gpt-5-2025-08-07"
+EMBEDDING_MODEL_NAME = "text-embedding-3-large"
+
+
+def get_openai_api_key() -> str:
+    openai_api_key = os.getenv("OPENAI_API_KEY")
+    if not openai_api_key:
+        raise ValueError("OPENAI_API_KEY environment variable not set.")
+    return openai_api_key
+
+
+@lru_cache(maxsize=1)
+def get_model_call_metrics() -> ModelCallMetrics:
+    return ModelCallMetrics()
+
+
+@lru_cache(maxsize=1)
+def get_rate_limit_governor() -> RateLimitGovernor:
+    return RateLimitGovernor()
+
+
+@lru_cache(maxsize=1)
+def get_http_clients() -> tuple:
+    """
+    The sync and async HTTP clients behind every OpenAI model. Requests go
+    through the shared rate limit governor, which also owns retries, so the
+    SDK's own retries are turned off.
+    """
+    import httpx
+
+    governor = get_rate_limit_governor()
+    limits = httpx.Limits(max_connections=1000, max_keepalive_connections=100)
+    return (
+        httpx.Client(transport=GovernedTransport(httpx.HTTPTransport(limits=limits), governor), follow_redirects=True),
+        httpx.AsyncClient(
+            transport=AsyncGovernedTransport(httpx.AsyncHTTPTransport(limits=limits), governor), follow_redirects=True
+        ),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_chat_model(model_name: str = GENERATION_MODEL_NAME) -> "ChatOpenAI":
+    # The OpenAI SDK is imported on first use rather than with this module.
+    from langchain_openai import ChatOpenAI
+
+    http_client, http_async_client = get_http_clients()
+    return ChatOpenAI(
+        openai_api_key=get_openai_api_key(),
+        model_name=model_name,
+        callbacks=[get_model_call_metrics()],
+        http_client=http_client,
+        http_async_client=http_async_client,
+        max_retries=0,
+        # Custom HTTP clients turn off langchain-openai's default of asking for
+        # usage on streamed calls, which the metrics and the governor need.
+        stream_usage=True,
+    )
+
+
+def get_translation_model() -> "ChatOpenAI":
+    return get_chat_model(os.getenv("TRANSLATION_MODEL_NAME", "gpt-4o-mini"))
+
+
+@lru_cache(maxsize=1)
+def get_embeddings() -> CachedEmbeddings:
+    from langchain_openai import OpenAIEmbeddings
+
+    http_client, http_async_client = get_http_clients()
+    embeddings = CachedEmbeddings(
+        OpenAIEmbeddings(
+            openai_api_key=get_openai_api_key(),
+            model=EMBEDDING_MODEL_NAME,
+            http_client=http_client,
+            http_async_client=http_async_client,
+            max_retries=0,
+        ),
+        model=EMBEDDING_MODEL_NAME,
+    )
+    CACHE_STATS.register("embeddings", embeddings.stats)
+    return embeddings
+
+
+@lru_cache(maxsize=1)
+def get_llm_cache() -> LLMResponseCache:
+    cache = LLMResponseCache()
+    CACHE_STATS.register("llm_responses", cache.stats)
+    return cache
+
+
+@lru_cache(maxsize=1)
+def get_vector_store() -> VectorStore:
+    return create_vector_store()
+
+
+@lru_cache(maxsize=1)
+def get_translator() -> ChunkTranslator:
+    translator = ChunkTranslator(get_translation_model())
+    CACHE_STATS.register("translations", translator.cache.stats)
+    return translator
+
+
+@lru_cache(maxsize=1)
+def get_conversation_memory() -> ConversationMemory:
+    return ConversationMemory(get_chat_model(os.getenv("SUMMARY_MODEL_NAME", "gpt-4o-mini")))
@@ -0,0 +1,182 @@
+import os
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from backend.src.instrumentation import CONTEXT_TOKENS
+from backend.src.language import is_probably_english
+from backend.src.tokens import TokenCounter, tiktoken_counter
+
+logger = logging.getLogger(__name__)
+
+# Chunks of a page closer than this many characters are joined into one passage.
+MAX_GAP_CHARS = 2
+MIN_TEXT_OVERLAP = 20
+
+
+def join_overlapping(first: str, second: str) -> str:
+    """
+    Appends `second` to `first` without repeating the longest prefix of
+    `second` that `first` already ends with. Prefixes shorter than
+    `MIN_TEXT_OVERLAP` characters are not treated as overlap.
+    """
+    for size in range(min(len(first), len(second)), MIN_TEXT_OVERLAP - 1, -1):
+        if first.endswith(second[:size]):
+            return first + second[size:]
+    return f"{first} {second}"
+
+
+def mmr_select(vectors: np.ndarray, relevance: np.ndarray, k: int, diversity: float) -> List[int]:
+    """
+    Maximal marginal relevance over unit vectors.
+
+    Args:
+        vectors: One unit-normalised row per candidate
+        relevance: Relevance of each candidate, scaled to [0, 1]
+        k: Number of candidates to select
+        diversity: Weight of the redundancy penalty, from 0 (rank by relevance) to 1
+
+    Returns:
+        List[int]: Indices of the selected candidates in selection order
+    """
+    count = len(relevance)
+    if count <= k:
+        return [int(i) for i in np.argsort(-relevance)]
+    similarity = vectors @ vectors.T
+    # Highest similarity of each candidate to anything selected so far.
+    redundancy = np.zeros(count, dtype=np.float32)
+    available = np.ones(count, dtype=bool)
+    selected = []
+    for _ in range(k):
+        scores = (1 - diversity) * relevance - diversity * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, similarity[best])
+    return selected
+
+
+class ContextAssembler:
+    """Turns retrieved candidate chunks into the context passed to translation and generation.
+
+    Chunks are split with a 200 character overlap, so neighbouring chunks
+    repeat part of each other's text. From a larger candidate set, `max_chunks`
+    are selected by maximal marginal relevance, using the fused retrieval
+    score as relevance and the chunk embeddings (served from the embedding
+    cache) for redundancy. The selected chunks of the same file and page that
+    touch or overlap are then merged into one passage with the repeated span
+    removed, using their `start_index` offsets. English copies made at
+    ingestion are merged the same way. Token counts before and after are
+    logged and exported, and the tokens saved are returned with the context.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        max_chunks: int | None = None,
+        diversity: float | None = None,
+        token_counter: Optional[TokenCounter] = None,
+    ):
+        self.embeddings = embeddings
+        self.max_chunks = max_chunks or int(os.getenv("RETRIEVAL_MAX_CHUNKS", "10"))
+        self.diversity = diversity if diversity is not None else float(os.getenv("CONTEXT_MMR_DIVERSITY", "0.3"))
+        self.token_counter = token_counter or tiktoken_counter()
+
+    def count_tokens(self, text: str) -> int:
+        return self.token_counter(text)
+
+    async def _select(self, candidates: List[dict]) -> List[dict]:
+        if len(candidates) <= self.max_chunks:
+            return candidates
+        vectors = np.asarray(await self.embeddings.aembed_documents([c["page_content"] for c in candidates]), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+        scores = np.asarray([c.get("score", 0.0) for c in candidates], dtype=np.float32)
+        relevance = scores / scores.max() if scores.max() > 0 else np.ones(len(candidates), dtype=np.float32)
+        return [candidates[i] for i in mmr_select(vectors, relevance, self.max_chunks, self.diversity)]
+
+    @staticmethod
+    def _english(chunk: dict) -> Optional[str]:
+        english = chunk["metadata"].get("content_en")
+        if english is None and is_probably_english(chunk["page_content"]):
+            return chunk["page_content"]
+        return english
+
+    def _merge_group(self, chunks: List[dict]) -> List[Tuple[int, dict]]:
+        """Merges the chunks of one page, given as (selection rank, chunk), into passages."""
+        chunks = sorted(chunks, key=lambda item: item[1]["metadata"].get("start_index", 0))
+        passages = []
+        for rank, chunk in chunks:
+            start = chunk["metadata"].get("start_index")
+            text = chunk["page_content"]
+            if passages and start is not None and passages[-1]["end"] is not None and start <= passages[-1]["end"] + MAX_GAP_CHARS:
+                passage = passages[-1]
+                overlap = passage["end"] - start
+                if overlap >= len(text):
+                    passage["rank"] = min(passage["rank"], rank)
+                    continue
+                if overlap > 0 and passage["text"].endswith(text[:overlap]):
+                    passage["text"] += text[overlap:]
+                else:
+                    passage["text"] = join_overlapping(passage["text"], text)
+                passage["english"].append(self._english(chunk))
+                passage["end"] = start + len(text)
+                passage["rank"] = min(passage["rank"], rank)
+                passage["count"] += 1
+            else:
+                passages.append({
+                    "text": text,
+                    "english": [self._english(chunk)],
+                    "metadata": dict(chunk["metadata"]),
+                    "end": start + len(text) if start is not None else None,
+                    "rank": rank,
+                    "count": 1,
+                })
+
+        merged = []
+        for passage in passages:
+            metadata = passage["metadata"]
+            if passage["count"] > 1:
+                metadata["merged_chunks"] = passage["count"]
+                english = passage["english"]
+                metadata.pop("content_en", None)
+                # Without an English copy of every part the merged text is translated as a whole.
+                if all(part is not None for part in english):
+                    joined = english[0]
+                    for part in english[1:]:
+                        joined = join_overlapping(joined, part)
+                    if joined != passage["text"]:
+                        metadata["content_en"] = joined
+            merged.append((passage["rank"], {"page_content": passage["text"], "metadata": metadata}))
+        return merged
+
+    async def assemble(self, candidates: List[dict]) -> Tuple[List[dict], int]:
+        """
+        Selects and merges retrieved candidates.
+
+        Args:
+            candidates: Retrieved chunks, best first, with `page_content`, `metadata` and a fused `score`
+
+        Returns:
+            Tuple[List[dict], int]: The passages in relevance order, and the tokens saved by merging
+        """
+        selected = await self._select(candidates)
+        groups = {}
+        for rank, chunk in enumerate(selected):
+            key = (chunk["metadata"].get("source"), chunk["metadata"].get("page"))
+            groups.setdefault(key, []).append((rank, chunk))
+        passages = [passage for group in groups.values() for passage in self._merge_group(group)]
+        context = [passage for _, passage in sorted(passages, key=lambda item: item[0])]
+
+        selected_tokens = sum(self.count_tokens(chunk["page_content"]) for chunk in selected)
+        assembled_tokens = sum(self.count_tokens(passage["page_content"]) for passage in context)
+        CONTEXT_TOKENS.labels("selected").inc(selected_tokens)
+        CONTEXT_TOKENS.labels("assembled").inc(assembled_tokens)
+        saved = selected_tokens - assembled_tokens
+        logger.info(
+            f"Assembled {len(selected)} of {len(candidates)} candidate chunks into {len(context)} passages: "
+            f"{selected_tokens} -> {assembled_tokens} tokens ({saved} saved by removing overlap)"
+        )
+        return context, saved
@@ -0,0 +1,71 @@
+import os
+import asyncio
+import hashlib
+from array import array
+from typing import List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from backend.src.cache import CACHE_DIR, SQLiteLRUCache
+
+
+class CachedEmbeddings(Embeddings):
+    """Content-addressed cache in front of an embeddings client.
+
+    Vectors are keyed on a hash of the model name and the exact text, so
+    re-uploading the same document in a new thread reuses the stored vectors
+    instead of calling the embeddings endpoint again.
+    """
+
+    def __init__(self, underlying: Embeddings, model: str, cache: Optional[SQLiteLRUCache] = None):
+        self.underlying = underlying
+        self.model = model
+        self.cache = cache or SQLiteLRUCache(
+            path=os.getenv("EMBEDDING_CACHE_PATH", os.path.join(CACHE_DIR, "embeddings.sqlite")),
+            table="embeddings",
+            max_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "20000")),
+        )
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model}\n{text}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _encode(vector: List[float]) -> bytes:
+        return array("f", vector).tobytes()
+
+    @staticmethod
+    def _decode(value: bytes) -> List[float]:
+        vector = array("f")
+        vector.frombytes(value)
+        return vector.tolist()
+
+    def _lookup(self, texts: List[str]):
+        keys = [self._key(text) for text in texts]
+        cached = self.cache.get_many(keys)
+        missing = list(dict.fromkeys(text for text, key in zip(texts, keys) if key not in cached))
+        return keys, cached, missing
+
+    def _assemble(self, keys, cached, missing, vectors) -> List[List[float]]:
+        fresh = {self._key(text): vector for text, vector in zip(missing, vectors)}
+        self.cache.set_many({key: self._encode(vector) for key, vector in fresh.items()})
+        return [fresh[key] if key in fresh else self._decode(cached[key]) for key in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, cached, missing = self._lookup(texts)
+        vectors = self.underlying.embed_documents(missing) if missing else []
+        return self._assemble(keys, cached, missing, vectors)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, cached, missing = await asyncio.to_thread(self._lookup, texts)
+        vectors = await self.underlying.aembed_documents(missing) if missing else []
+        return await asyncio.to_thread(self._assemble, keys, cached, missing, vectors)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+    def stats(self) -> dict:
+        """Returns the hit/miss counters and current size of the cache."""
+        return self.cache.stats()
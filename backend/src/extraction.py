@@ -0,0 +1,79 @@
+import re
+from typing import Optional
+
+# Explicit pronoun sets, e.g. "she/her", "he/him/his", "they / them".
+PRONOUN_SETS = {
+    "she": "she/her",
+    "he": "he/him",
+    "they": "they/them",
+    "ella": "she/her",
+    "él": "he/him",
+    "el": "he/him",
+    "elle": "they/them",
+}
+PRONOUN_PATTERN = re.compile(r"\b(she|he|they)\s*/\s*(her|him|them)(?:\s*/\s*(hers|his|theirs))?\b", re.IGNORECASE)
+LABELED_PRONOUN_PATTERN = re.compile(
+    r"\b(?:pronouns?|pronombres?)\s*(?:are|is|son|es|:|-)\s*[\"']?(she|he|they|ella|él|el|elle)\b",
+    re.IGNORECASE,
+)
+
+# A person's name: two to five capitalised words or initials on one line,
+# allowing accents, hyphens and particles. Names are matched case-sensitively
+# while the labels around them are not.
+NAME_WORD = r"[A-ZÁÉÍÓÚÑÜ](?:[\w'’-]+|\.)"
+NAME = rf"({NAME_WORD}(?:[ \t]+(?:(?:de|del|la|los|van|von|da|dos)[ \t]+)*{NAME_WORD}){{1,4}})"
+CLIENT_LABEL = (
+    r"(?i:client|candidate|applicant|beneficiary|petitioner|cliente|candidat[oa]|solicitante|beneficiari[oa]|peticionari[oa])"
+)
+TITLE = r"(?:(?:Dr|Mr|Ms|Mrs|Prof)\.?[ \t]+)?"
+NAME_PATTERNS = [
+    re.compile(rf"\b{CLIENT_LABEL}(?:'s|’s)?\s+(?i:full\s+)?(?i:name)\s*(?i:is|:|-)\s*{TITLE}{NAME}"),
+    re.compile(rf"\b(?i:(?:full\s+)?name\s+of\s+the)\s+{CLIENT_LABEL}\s*(?i:is|:|-)\s*{TITLE}{NAME}"),
+    re.compile(rf"\b(?i:nombre\s+(?:completo\s+)?del?\s+(?:la\s+)?){CLIENT_LABEL}\s*(?i:es|:|-)\s*{TITLE}{NAME}"),
+    re.compile(rf"\b(?i:the\s+){CLIENT_LABEL}\s+(?i:is)\s+(?i:named\s+)?{TITLE}{NAME}"),
+]
+
+
+def _single(values: set) -> Optional[str]:
+    # Documents describe both the candidate and the recommender, so anything
+    # ambiguous is left to the model.
+    return next(iter(values)) if len(values) == 1 else None
+
+
+def extract_pronouns(text: str) -> Optional[str]:
+    """
+    Finds the client's pronouns from explicit pronoun sets or a labeled
+    "pronouns:" field.
+
+    Returns:
+        Optional[str]: The normalised pronoun set, or None when absent or ambiguous
+    """
+    found = {PRONOUN_SETS[match.group(1).lower()] for match in PRONOUN_PATTERN.finditer(text)}
+    found |= {PRONOUN_SETS[match.group(1).lower()] for match in LABELED_PRONOUN_PATTERN.finditer(text)}
+    return _single(found)
+
+
+def extract_client_name(text: str) -> Optional[str]:
+    """
+    Finds the client's name from fields labeled as the client's, candidate's
+    or beneficiary's name, in English or Spanish.
+
+    Returns:
+        Optional[str]: The name, or None when absent or ambiguous
+    """
+    found = set()
+    for pattern in NAME_PATTERNS:
+        for match in pattern.finditer(text):
+            found.add(" ".join(match.group(1).split()))
+    return _single(found)
+
+
+def extract_client_fields(text: str) -> dict:
+    """
+    Runs the local extractors over the given text.
+
+    Returns:
+        dict: `client_name` and `client_pronouns` for the values found confidently
+    """
+    fields = {"client_name": extract_client_name(text), "client_pronouns": extract_pronouns(text)}
+    return {field: value for field, value in fields.items() if value}
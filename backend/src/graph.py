@@ -1,30 +1,47 @@
+import logging
+from functools import lru_cache
+
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
 
 from backend.src.schemas import GraphState
+from backend.src.checkpointer import SQLiteCheckpointSaver
 from backend.src.agent import DocumentGenerationAgent
 from backend.src.orchestrator import OrchestratorAgent
 from backend.src.nodes.translate_context_node import TranslateContextNode
 
+logger = logging.getLogger(__name__)
+
 def decide_next_node(state: GraphState) -> str:
     """
     Determines the next node to visit based on context completeness.
     """
     if not state["missing_fields"]:
-        print("---CONTEXT IS COMPLETE---")
+        logger.info("---CONTEXT IS COMPLETE---")
         return "generate_document"
     else:
-        print("---CONTEXT IS INCOMPLETE, PAUSING FOR USER INPUT---")
+        logger.info("---CONTEXT IS INCOMPLETE, PAUSING FOR USER INPUT---")
         state["missing_fields"] = []
         return "request_user_info"
 
-def create_graph():
+def route_from_master_router(state: GraphState) -> str:
+    """
+    Follows the route the master router recorded on the state.
+    """
+    return state["route"]
+
+def create_graph(agent=None, translate_node=None, orchestrator=None, checkpointer=None):
     """
     Creates and compiles the LangGraph agent.
+
+    Nodes hold no per-session state, so one compiled graph serves every
+    conversation; each run is isolated by the `thread_id` in its config.
+    Checkpoints default to the bounded SQLite saver so conversations survive
+    restarts. The nodes are coroutines, so the graph is driven with `ainvoke`
+    or `astream` and waits on model and search calls without holding a thread.
     """
-    agent = DocumentGenerationAgent()
-    translate_node = TranslateContextNode()
-    orchestrator = OrchestratorAgent()
+    agent = agent or DocumentGenerationAgent()
+    translate_node = translate_node or TranslateContextNode()
+    orchestrator = orchestrator or OrchestratorAgent()
     workflow = StateGraph(GraphState)
 
     workflow.add_node("retrieve_context", agent.retrieve_context)
@@ -35,8 +52,10 @@ def create_graph():
     workflow.add_node("context_gatherer_agent", agent.context_gatherer_agent)
     workflow.add_node("master_router", orchestrator.master_router)
 
-    workflow.set_conditional_entry_point(
-        orchestrator.master_router,
+    workflow.set_entry_point("master_router")
+    workflow.add_conditional_edges(
+        "master_router",
+        route_from_master_router,
         {
             "retrieve_context": "retrieve_context",
             "context_gatherer_agent": "context_gatherer_agent",
@@ -58,7 +77,15 @@ def create_graph():
     workflow.add_edge("context_gatherer_agent", END)
     workflow.add_edge("request_user_info","context_completeness_check")
 
-    memory = MemorySaver()
+    memory = checkpointer or SQLiteCheckpointSaver()
     app = workflow.compile(checkpointer=memory, interrupt_before=["request_user_info"])
     
     return app, agent
+
+@lru_cache(maxsize=1)
+def get_graph():
+    """
+    Returns the process-wide compiled graph and its document agent, building
+    them on first use.
+    """
+    return create_graph()
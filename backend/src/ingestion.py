@@ -0,0 +1,312 @@
+import logging
+import os
+import json
+import time
+import asyncio
+import hashlib
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from openai import RateLimitError
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from backend.src.pdf_extraction import PARSE_WORKERS, count_pages, extract_pages, get_parse_pool
+from backend.src.rate_limit import caller_backoff
+from backend.src.tokens import TokenCounter, tiktoken_counter
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[str], Awaitable[None]]
+
+
+class PDFIngestionPipeline:
+    """Async pipeline that parses, embeds and uploads PDFs without blocking the event loop.
+
+    Page ranges are extracted in a process pool and streamed straight into the
+    splitter. Chunks are packed into batches by token count, up to
+    `max_batch_tokens` and `max_batch_items` per embeddings request, and handed
+    to `max_concurrency` embedding workers through a bounded queue. Chunking and embedding of the
+    first pages therefore overlap with parsing of later ones, and the number of
+    pages and chunks held in memory stays bounded regardless of document size.
+    Each batch is uploaded as soon as it is embedded, and uploaded chunks are
+    also written through to `recent_chunks` when one is given.
+
+    When a `translator` is given, every chunk is translated to English while it
+    is being embedded and the translation is stored in its metadata as
+    `content_en`, so retrieval never has to translate on the interactive path.
+
+    Chunk ids are deterministic, so re-ingesting a file only uploads the chunks
+    that changed and deletes the ones that disappeared; an unchanged file is
+    recognised by its hash and not parsed at all.
+
+    When the embeddings endpoint answers 429 the item ceiling is halved, and it
+    grows back by one item per successful request afterwards.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        vector_store,
+        recent_chunks=None,
+        translator=None,
+        max_batch_tokens: Optional[int] = None,
+        max_batch_items: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        token_counter: Optional[TokenCounter] = None,
+    ):
+        self.embeddings = embeddings
+        self.vector_store = vector_store
+        self.recent_chunks = recent_chunks
+        self.translator = translator
+        self.max_batch_tokens = max_batch_tokens or int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "60000"))
+        self.max_batch_items = max_batch_items or int(os.getenv("EMBEDDING_BATCH_MAX_ITEMS", "256"))
+        self.batch_items = self.max_batch_items
+        self.max_rate_limit_retries = 5
+        self.token_counter = token_counter or tiktoken_counter()
+        self.max_concurrency = max_concurrency or int(os.getenv("INGESTION_MAX_CONCURRENCY", "4"))
+        self.pages_per_task = int(os.getenv("INGESTION_PAGES_PER_TASK", "8"))
+        self.text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200, add_start_index=True)
+
+    @staticmethod
+    def chunk_id(thread_id: str, source: str, page: int, start_index: int, content: str) -> str:
+        """
+        Derives a stable chunk id from its thread, file, page, offset within the
+        page and a hash of its text, so an edited chunk gets a new id while
+        untouched chunks keep theirs.
+        """
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        key = f"{thread_id}|{source}|{page}|{start_index}|{content_hash}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _hash_file(file_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _existing_chunks(self, thread_id: str) -> Dict[str, Dict[str, dict]]:
+        """Returns the stored chunk metadata of a thread grouped by source file and keyed by id."""
+        documents = self.vector_store.list_documents(thread_id)
+        if self.recent_chunks is not None:
+            documents += self.recent_chunks.list_documents(thread_id)
+        by_source: Dict[str, Dict[str, dict]] = {}
+        for document in documents:
+            by_source.setdefault(document["metadata"].get("source", ""), {})[document["id"]] = document["metadata"]
+        return by_source
+
+    async def _extract(self, file_paths: List[str]):
+        """Yields (file path, [(page, text)]) page ranges as the process pool finishes them."""
+        loop = asyncio.get_running_loop()
+        pool = get_parse_pool()
+        window = PARSE_WORKERS * 2
+        pending = set()
+
+        for file_path in file_paths:
+            page_count = await loop.run_in_executor(pool, count_pages, file_path)
+            for start in range(0, page_count, self.pages_per_task):
+                if len(pending) >= window:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                end = min(start + self.pages_per_task, page_count)
+                pending.add(loop.run_in_executor(pool, extract_pages, file_path, start, end))
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+    def _split(self, file_path: str, pages, thread_id: str, file_hash: str):
+        source = os.path.basename(file_path)
+        docs = self.text_splitter.create_documents(
+            [text for _, text in pages],
+            metadatas=[
+                {"thread_id": thread_id, "source": source, "page": page, "file_hash": file_hash}
+                for page, _ in pages
+            ],
+        )
+        for doc in docs:
+            doc.id = self.chunk_id(thread_id, source, doc.metadata["page"], doc.metadata["start_index"], doc.page_content)
+        return docs
+
+    def _count_tokens(self, text: str) -> int:
+        return self.token_counter(text)
+
+    async def _embed(self, texts: List[str], report) -> List[List[float]]:
+        """Embeds texts in requests of at most `batch_items`, shrinking that ceiling on 429s."""
+        vectors = []
+        start = 0
+        failures = 0
+        while start < len(texts):
+            part = texts[start:start + self.batch_items]
+            try:
+                # 429s come back here instead of being retried as is, so the batch can shrink first.
+                with caller_backoff():
+                    vectors.extend(await self.embeddings.aembed_documents(part))
+            except RateLimitError:
+                failures += 1
+                if failures > self.max_rate_limit_retries:
+                    raise
+                self.batch_items = max(1, len(part) // 2)
+                await report(f"Rate limited by the embeddings endpoint, shrinking batches to {self.batch_items} chunks.")
+                await asyncio.sleep(min(2 ** failures, 30))
+                continue
+            start += len(part)
+            failures = 0
+            self.batch_items = min(self.max_batch_items, self.batch_items + 1)
+        return vectors
+
+    async def run(
+        self,
+        file_paths: List[str],
+        thread_id: str,
+        on_progress: Optional[ProgressCallback] = None,
+        on_batch: Optional[Callable[[], None]] = None,
+    ) -> dict:
+        """
+        Runs the pipeline for the given files.
+
+        Args:
+            file_paths: Paths of the PDFs to ingest
+            thread_id: The thread the chunks belong to
+            on_progress: Optional coroutine called with a status line after each stage
+            on_batch: Optional callable run each time a batch has been uploaded and is searchable
+
+        Returns:
+            dict: Counts of chunks `added`, `skipped` as unchanged and `removed` as stale
+        """
+        async def report(message: str):
+            logger.info(message)
+            if on_progress:
+                await on_progress(message)
+
+        batch_queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrency * 2)
+        totals = {"pages": 0, "chunks": 0, "batches": 0, "tokens": 0, "skipped": 0, "removed": 0}
+        started = time.perf_counter()
+
+        existing = await asyncio.to_thread(self._existing_chunks, thread_id)
+        file_hashes = {}
+        for file_path in file_paths:
+            source = os.path.basename(file_path)
+            file_hash = await asyncio.to_thread(self._hash_file, file_path)
+            stored = existing.get(source, {})
+            if stored and all(metadata.get("file_hash") == file_hash for metadata in stored.values()):
+                totals["skipped"] += len(stored)
+                await report(f"{source} is unchanged, skipping {len(stored)} chunks.")
+                continue
+            file_hashes[file_path] = file_hash
+
+        current_ids = {os.path.basename(file_path): set() for file_path in file_hashes}
+        # Unchanged chunks of an edited file are kept, but take the new file hash
+        # so the file as a whole is recognised as unchanged on the next upload.
+        retained: Dict[str, dict] = {}
+
+        async def produce():
+            batch, batch_tokens = [], 0
+            async for file_path, pages in self._extract(list(file_hashes)):
+                source = os.path.basename(file_path)
+                totals["pages"] += len(pages)
+                first, last = pages[0][0] + 1, pages[-1][0] + 1
+                await report(f"Parsed pages {first}-{last} of {source}.")
+                for doc in self._split(file_path, pages, thread_id, file_hashes[file_path]):
+                    current_ids[source].add(doc.id)
+                    stored = existing.get(source, {}).get(doc.id)
+                    if stored is not None:
+                        totals["skipped"] += 1
+                        if stored.get("file_hash") != doc.metadata["file_hash"]:
+                            retained[doc.id] = {**stored, **doc.metadata}
+                        continue
+                    tokens = self._count_tokens(doc.page_content)
+                    # An oversized chunk still gets a request of its own rather than blocking the queue.
+                    if batch and (batch_tokens + tokens > self.max_batch_tokens or len(batch) >= self.batch_items):
+                        await batch_queue.put((batch, batch_tokens))
+                        batch, batch_tokens = [], 0
+                    batch.append(doc)
+                    batch_tokens += tokens
+            if batch:
+                await batch_queue.put((batch, batch_tokens))
+            for _ in range(self.max_concurrency):
+                await batch_queue.put(None)
+
+        async def consume():
+            while (item := await batch_queue.get()) is not None:
+                await process_batch(*item)
+
+        async def process_batch(batch, batch_tokens: int):
+            texts = [doc.page_content for doc in batch]
+            if self.translator is not None:
+                embeddings, translations = await asyncio.gather(
+                    self._embed(texts, report), self.translator.atranslate(texts)
+                )
+                for doc, translation in zip(batch, translations):
+                    if translation != doc.page_content:
+                        doc.metadata["content_en"] = translation
+            else:
+                embeddings = await self._embed(texts, report)
+
+            documents_to_upload = []
+            for i, doc in enumerate(batch):
+                documents_to_upload.append(
+                    {
+                        "id": doc.id,
+                        "content": texts[i],
+                        "content_vector": embeddings[i],
+                        "thread_id": doc.metadata["thread_id"],
+                        "metadata": json.dumps(doc.metadata),
+                    }
+                )
+
+            await asyncio.to_thread(self.vector_store.upload_documents, documents_to_upload)
+            if self.recent_chunks is not None:
+                self.recent_chunks.add(thread_id, documents_to_upload)
+            if on_batch:
+                on_batch()
+
+            totals["chunks"] += len(batch)
+            totals["tokens"] += batch_tokens
+            totals["batches"] += 1
+            await report(
+                f"Processed batch {totals['batches']} ({len(batch)} chunks, {batch_tokens} tokens, "
+                f"{totals['chunks']} chunks so far)."
+            )
+
+        async with asyncio.TaskGroup() as group:
+            group.create_task(produce())
+            for _ in range(self.max_concurrency):
+                group.create_task(consume())
+
+        # Only once every replacement chunk is uploaded, so a failed run leaves
+        # the file's previous chunks in place.
+        stale = [
+            chunk_id
+            for source, ids in current_ids.items()
+            for chunk_id in existing.get(source, {})
+            if chunk_id not in ids
+        ]
+        if retained:
+            await asyncio.to_thread(self.vector_store.update_metadata, thread_id, retained)
+            if self.recent_chunks is not None:
+                self.recent_chunks.update_metadata(thread_id, retained)
+        if stale:
+            await asyncio.to_thread(self.vector_store.delete_documents, thread_id, stale)
+            if self.recent_chunks is not None:
+                self.recent_chunks.remove(thread_id, stale)
+            totals["removed"] += len(stale)
+
+        summary = {"added": totals["chunks"], "skipped": totals["skipped"], "removed": totals["removed"]}
+        if not any(summary.values()):
+            await report("No documents to process.")
+            return summary
+
+        if totals["chunks"]:
+            elapsed = max(time.perf_counter() - started, 1e-9)
+            await report(
+                f"Documents have been processed and stored in the vector store for thread: {thread_id} "
+                f"({totals['pages']} pages, {totals['chunks']} chunks in {elapsed:.1f}s, "
+                f"{totals['chunks'] / elapsed:.1f} chunks/sec, {totals['tokens'] / elapsed:.0f} tokens/sec)."
+            )
+        await report(
+            f"Added {summary['added']} chunks, skipped {summary['skipped']} unchanged, removed {summary['removed']} stale."
+        )
+        return summary
@@ -0,0 +1,268 @@
+import os
+import time
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import REGISTRY, GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+# USD per million tokens: (uncached input, cached input, output). Model names
+# are matched by prefix, longest first, so dated snapshots share a price.
+MODEL_PRICES = {
+    "gpt-5-mini": (0.25, 0.025, 2.0),
+    "gpt-5": (1.25, 0.125, 10.0),
+    "gpt-4o-mini": (0.15, 0.075, 0.6),
+    "gpt-4o": (2.5, 1.25, 10.0),
+}
+
+NODE_DURATION = Histogram(
+    "lor_node_duration_seconds", "Wall time of a graph node", ["node"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+NODE_QUEUE = Histogram(
+    "lor_node_queue_seconds", "Time between the previous step of the turn ending and a node starting", ["node"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5),
+)
+LLM_DURATION = Histogram(
+    "lor_llm_call_duration_seconds", "Wall time of a model call", ["model", "node"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+LLM_TOKENS = Counter("lor_llm_tokens", "Model tokens by kind (prompt, cached_prompt, completion)", ["model", "node", "kind"])
+LLM_COST = Counter("lor_llm_cost_usd", "Estimated model cost in USD", ["model", "node"])
+LLM_ERRORS = Counter("lor_llm_errors", "Failed model calls", ["node"])
+LLM_CACHE_LOOKUPS = Counter("lor_llm_cache_lookups", "Model response cache lookups by result (hit, miss, expired)", ["node", "result"])
+CONTEXT_TOKENS = Counter(
+    "lor_context_tokens", "Retrieved context tokens selected and left after overlap removal (selected, assembled)", ["kind"]
+)
+
+RATE_LIMIT_WAITING = Gauge(
+    "lor_rate_limit_waiting", "OpenAI requests waiting for rate limit capacity", ["model", "priority"]
+)
+RATE_LIMIT_WAIT = Histogram(
+    "lor_rate_limit_wait_seconds", "Time an OpenAI request waited for rate limit capacity", ["model", "priority"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+RATE_LIMIT_RETRIES = Counter(
+    "lor_rate_limit_retries", "OpenAI requests retried, by reason (429, 5xx status, connection)", ["model", "reason"]
+)
+
+
+def configure_logging():
+    """Sets up root logging once, at the level given by `LOG_LEVEL` (default INFO)."""
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
+
+def estimate_cost(model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> float:
+    for prefix in sorted(MODEL_PRICES, key=len, reverse=True):
+        if model.startswith(prefix):
+            uncached_price, cached_price, output_price = MODEL_PRICES[prefix]
+            return (
+                (prompt_tokens - cached_tokens) * uncached_price
+                + cached_tokens * cached_price
+                + completion_tokens * output_price
+            ) / 1_000_000
+    return 0.0
+
+
+def _usage(response) -> List[dict]:
+    """
+    Extracts model name and token usage from every generation of an `LLMResult`.
+    Responses served from the local response cache report no tokens.
+    """
+    usages = []
+    for generations in response.generations:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            usage = getattr(message, "usage_metadata", None)
+            if not usage:
+                continue
+            metadata = message.response_metadata or {}
+            cached = bool(metadata.get("response_cached"))
+            usages.append({
+                "model": metadata.get("model_name", "unknown"),
+                "prompt_tokens": 0 if cached else usage.get("input_tokens", 0),
+                "cached_tokens": 0 if cached else (usage.get("input_token_details") or {}).get("cache_read", 0) or 0,
+                "completion_tokens": 0 if cached else usage.get("output_tokens", 0),
+                "response_cached": cached,
+            })
+    return usages
+
+
+class ModelCallMetrics(BaseCallbackHandler):
+    """Records latency, tokens, prompt cache reads and cost of every model call.
+
+    Attached to the shared chat models, so calls made outside a graph run,
+    such as ingestion-time translation, are counted too. Calls made inside a
+    node are labeled with that node.
+    """
+
+    run_inline = True
+
+    def __init__(self):
+        self._started: Dict = {}
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        with self._lock:
+            self._started[run_id] = (time.perf_counter(), (metadata or {}).get("langgraph_node", "none"))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        with self._lock:
+            started, node = self._started.pop(run_id, (None, "none"))
+        duration = time.perf_counter() - started if started else 0.0
+        for usage in _usage(response):
+            model = usage["model"]
+            if usage["response_cached"]:
+                logger.info(f"{model} call in {node} answered from the response cache in {duration:.3f}s")
+                continue
+            cost = estimate_cost(model, usage["prompt_tokens"], usage["cached_tokens"], usage["completion_tokens"])
+            LLM_DURATION.labels(model, node).observe(duration)
+            LLM_TOKENS.labels(model, node, "prompt").inc(usage["prompt_tokens"])
+            LLM_TOKENS.labels(model, node, "cached_prompt").inc(usage["cached_tokens"])
+            LLM_TOKENS.labels(model, node, "completion").inc(usage["completion_tokens"])
+            LLM_COST.labels(model, node).inc(cost)
+            logger.info(
+                f"{model} call in {node} took {duration:.2f}s: {usage['prompt_tokens']} prompt tokens "
+                f"({usage['cached_tokens']} cached, {usage['prompt_tokens'] - usage['cached_tokens']} uncached), "
+                f"{usage['completion_tokens']} completion tokens, ${cost:.4f}"
+            )
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self._lock:
+            _, node = self._started.pop(run_id, (None, "none"))
+        LLM_ERRORS.labels(node).inc()
+
+
+class TurnTrace(BaseCallbackHandler):
+    """Collects the node spans and model calls of one graph run.
+
+    Pass an instance in the run config's `callbacks`. Node timings feed the
+    Prometheus histograms, and `summary()` renders the turn for display.
+    """
+
+    run_inline = True
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.nodes: List[dict] = []
+        self.calls: List[dict] = []
+        self._open: Dict = {}
+        self._last_end = self.started
+        self._lock = threading.Lock()
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        # Runnables nested inside a node carry the same metadata; only the node's own run counts.
+        if node and kwargs.get("name") == node:
+            now = time.perf_counter()
+            with self._lock:
+                self._open[run_id] = (node, now, max(0.0, now - self._last_end))
+
+    def _close(self, run_id, status: str):
+        with self._lock:
+            span = self._open.pop(run_id, None)
+            if span is None:
+                return
+            node, started, queued = span
+            now = time.perf_counter()
+            self._last_end = now
+            self.nodes.append({"node": node, "duration": now - started, "queue": queued, "status": status})
+        NODE_DURATION.labels(node).observe(now - started)
+        NODE_QUEUE.labels(node).observe(queued)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._close(run_id, "ok")
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._close(run_id, "error")
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        with self._lock:
+            self._open[run_id] = ((metadata or {}).get("langgraph_node", "none"), time.perf_counter(), 0.0)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        with self._lock:
+            node, started, _ = self._open.pop(run_id, ("none", time.perf_counter(), 0.0))
+            duration = time.perf_counter() - started
+            for usage in _usage(response):
+                cost = estimate_cost(usage["model"], usage["prompt_tokens"], usage["cached_tokens"], usage["completion_tokens"])
+                self.calls.append({"node": node, "duration": duration, "cost": cost, **usage})
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self._lock:
+            self._open.pop(run_id, None)
+
+    def totals(self) -> dict:
+        return {
+            "wall_time": time.perf_counter() - self.started,
+            "prompt_tokens": sum(call["prompt_tokens"] for call in self.calls),
+            "cached_tokens": sum(call["cached_tokens"] for call in self.calls),
+            "completion_tokens": sum(call["completion_tokens"] for call in self.calls),
+            "cost": sum(call["cost"] for call in self.calls),
+        }
+
+    def summary(self) -> str:
+        """Renders one line per node with its model calls, followed by the turn totals."""
+        lines = []
+        for span in self.nodes:
+            lines.append(
+                f"{span['node']}: {span['duration']:.2f}s (queued {span['queue'] * 1000:.0f}ms)"
+                + (" [error]" if span["status"] == "error" else "")
+            )
+            for call in self.calls:
+                if call["node"] == span["node"]:
+                    if call["response_cached"]:
+                        lines.append(f"  {call['model']}: {call['duration']:.2f}s, from response cache")
+                        continue
+                    lines.append(
+                        f"  {call['model']}: {call['duration']:.2f}s, {call['prompt_tokens']} prompt "
+                        f"({call['cached_tokens']} cached) / {call['completion_tokens']} completion tokens, ${call['cost']:.4f}"
+                    )
+        totals = self.totals()
+        lines.append(
+            f"Total: {totals['wall_time']:.2f}s, {totals['prompt_tokens']} prompt ({totals['cached_tokens']} cached) / "
+            f"{totals['completion_tokens']} completion tokens, ${totals['cost']:.4f}"
+        )
+        return "\n".join(lines)
+
+
+class CacheStatsCollector:
+    """Exposes the hit and miss counters of the local caches at scrape time."""
+
+    def __init__(self):
+        self._sources: Dict[str, Callable[[], dict]] = {}
+
+    def register(self, name: str, stats: Callable[[], dict]):
+        self._sources[name] = stats
+
+    def collect(self):
+        hits = GaugeMetricFamily("lor_cache_hits", "Local cache hits since start", labels=["cache"])
+        misses = GaugeMetricFamily("lor_cache_misses", "Local cache misses since start", labels=["cache"])
+        entries = GaugeMetricFamily("lor_cache_entries", "Entries held by a local cache", labels=["cache"])
+        for name, stats in self._sources.items():
+            values = stats()
+            hits.add_metric([name], values.get("hits", 0))
+            misses.add_metric([name], values.get("misses", 0))
+            entries.add_metric([name], values.get("entries", 0))
+        yield hits
+        yield misses
+        yield entries
+
+
+CACHE_STATS = CacheStatsCollector()
+REGISTRY.register(CACHE_STATS)
+
+
+def render_metrics() -> tuple:
+    """
+    Returns:
+        tuple: (Prometheus text exposition of every metric, its content type)
+    """
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
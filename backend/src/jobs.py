@@ -0,0 +1,149 @@
+import os
+import time
+import uuid
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+IngestFunction = Callable[[List[str], str, Callable[[str], Awaitable[None]]], Awaitable[dict]]
+
+
+class IngestionQueueFull(Exception):
+    """Raised when a job is submitted while every queue slot is taken."""
+
+
+class IngestionJob:
+    """One ingestion run of uploaded files for a thread, with its progress log."""
+
+    def __init__(self, thread_id: str, file_paths: List[str]):
+        self.id = str(uuid.uuid4())
+        self.thread_id = thread_id
+        self.file_paths = file_paths
+        self.status = "queued"
+        self.progress: List[str] = []
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._updated = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def _notify(self):
+        # Subscribers wait on the current event; a fresh one is armed for the next update.
+        self._updated.set()
+        self._updated = asyncio.Event()
+
+    async def report(self, message: str):
+        self.progress.append(message)
+        self._notify()
+
+    async def run(self, ingest: IngestFunction):
+        self.status = "running"
+        self._notify()
+        try:
+            self.result = await ingest(self.file_paths, self.thread_id, self.report)
+            self.status = "completed"
+        except Exception as e:
+            logger.exception(f"Ingestion job {self.id} for thread {self.thread_id} failed")
+            self.error = str(e)
+            self.status = "failed"
+        self.finished_at = time.time()
+        self._notify()
+
+    async def events(self) -> AsyncIterator[str]:
+        """Yields every progress line, past and future, until the job finishes."""
+        sent = 0
+        while True:
+            updated = self._updated
+            while sent < len(self.progress):
+                yield self.progress[sent]
+                sent += 1
+            if self.finished:
+                return
+            await updated.wait()
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "thread_id": self.thread_id,
+            "status": self.status,
+            "files": [os.path.basename(path) for path in self.file_paths],
+            "progress": list(self.progress),
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class IngestionJobQueue:
+    """Bounded queue of ingestion jobs drained by a fixed pool of worker tasks.
+
+    `submit` never waits: once `max_queued` jobs are waiting it raises
+    `IngestionQueueFull`, so callers can push back instead of piling up
+    uploads in memory. Workers start on the first submit, inside the running
+    event loop. Finished jobs are remembered for status queries, up to
+    `max_jobs`, oldest first out.
+    """
+
+    def __init__(
+        self,
+        ingest: IngestFunction,
+        workers: int | None = None,
+        max_queued: int | None = None,
+        max_jobs: int | None = None,
+    ):
+        self.ingest = ingest
+        self.workers = workers or int(os.getenv("INGESTION_WORKERS", "2"))
+        self.max_queued = max_queued or int(os.getenv("INGESTION_QUEUE_SIZE", "8"))
+        self.max_jobs = max_jobs or int(os.getenv("INGESTION_JOB_HISTORY", "1000"))
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queued)
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._tasks: List[asyncio.Task] = []
+
+    def full(self) -> bool:
+        return self._queue.full()
+
+    def submit(self, thread_id: str, file_paths: List[str]) -> IngestionJob:
+        """
+        Queues the files of a thread for ingestion.
+
+        Returns:
+            IngestionJob: The queued job
+
+        Raises:
+            IngestionQueueFull: When no queue slot is free
+        """
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        job = IngestionJob(thread_id, file_paths)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise IngestionQueueFull(f"{self.max_queued} ingestion jobs are already waiting")
+        self._remember(job)
+        logger.info(f"Queued ingestion job {job.id} for thread {thread_id} ({len(file_paths)} files, {self._queue.qsize()} waiting)")
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        return self._jobs.get(job_id)
+
+    def _remember(self, job: IngestionJob):
+        self._jobs[job.id] = job
+        excess = len(self._jobs) - self.max_jobs
+        if excess > 0:
+            for job_id in [job_id for job_id, stored in self._jobs.items() if stored.finished][:excess]:
+                del self._jobs[job_id]
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await job.run(self.ingest)
+            finally:
+                self._queue.task_done()
+
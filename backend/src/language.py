@@ -0,0 +1,37 @@
+import re
+
+WORD_PATTERN = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+ENGLISH_STOPWORDS = {
+    "the", "and", "of", "to", "in", "is", "that", "for", "with", "as", "on", "was", "by", "he", "she",
+    "it", "this", "are", "be", "at", "from", "his", "her", "has", "have", "an", "which", "their", "or",
+    "they", "will", "been", "were", "not", "also", "who", "its", "our", "we", "my", "i",
+}
+
+# Stopwords of the other languages clients usually upload documents in.
+OTHER_STOPWORDS = {
+    # Spanish
+    "el", "la", "los", "las", "de", "del", "y", "en", "que", "por", "para", "con", "una", "un", "es",
+    "su", "sus", "se", "lo", "como", "más", "pero", "fue", "ha", "al", "sobre", "entre", "también",
+    # Portuguese
+    "da", "do", "das", "dos", "em", "uma", "não", "com", "ao", "pelo", "pela", "foi", "são",
+    # French
+    "le", "les", "des", "et", "est", "dans", "pour", "avec", "une", "sur", "au", "aux", "du", "qui",
+}
+
+
+def is_probably_english(text: str, min_words: int = 5) -> bool:
+    """
+    Cheap local language check based on stopword frequencies.
+
+    Returns True when English stopwords outnumber the stopwords of the other
+    supported languages at least four to one, so mixed-language chunks are
+    still translated. Texts too short to judge are treated as not English so
+    they still go through translation.
+    """
+    words = [word.lower() for word in WORD_PATTERN.findall(text)]
+    if len(words) < min_words:
+        return False
+    english = sum(word in ENGLISH_STOPWORDS for word in words)
+    other = sum(word in OTHER_STOPWORDS for word in words)
+    return english >= 2 and english >= 4 * other
@@ -0,0 +1,147 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+import unicodedata
+from typing import Any, Iterable, Optional
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, Generation
+from langgraph.config import get_config
+from pydantic import BaseModel
+
+from backend.src.cache import CACHE_DIR, SQLiteLRUCache
+from backend.src.instrumentation import LLM_CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+# Nodes whose model calls may be answered from the cache. The letter itself is
+# always generated fresh.
+DEFAULT_CACHED_NODES = ("master_router", "context_completeness_check", "context_gatherer_agent")
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(unicodedata.normalize("NFKC", value).split())
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    return value
+
+
+def _current_node() -> str:
+    try:
+        return get_config().get("metadata", {}).get("langgraph_node", "none")
+    except RuntimeError:
+        return "none"
+
+
+class LLMResponseCache(BaseCache):
+    """LangChain response cache on a bounded local SQLite store with expiry.
+
+    LangChain passes the serialized messages as `prompt` and the model name,
+    parameters and bound tools or response format, which carry the output
+    schema of structured calls, as `llm_string`. Entries are keyed on a hash
+    of both, with Unicode and whitespace differences in the messages
+    normalized away, so a retried or resent turn that builds the same prompt
+    is answered locally. Entries older than `ttl_seconds` count as misses and
+    are replaced. Cached responses are marked with `response_cached` in their
+    response metadata so usage is not billed twice, and every lookup is
+    counted per graph node.
+    """
+
+    def __init__(self, cache: Optional[SQLiteLRUCache] = None, ttl_seconds: float | None = None):
+        self.cache = cache or SQLiteLRUCache(
+            path=os.getenv("LLM_CACHE_PATH", os.path.join(CACHE_DIR, "llm_responses.sqlite")),
+            table="llm_responses",
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000")),
+        )
+        self.ttl_seconds = ttl_seconds or float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(prompt: str, llm_string: str) -> str:
+        try:
+            normalized = json.dumps(_normalize(json.loads(prompt)), sort_keys=True)
+        except json.JSONDecodeError:
+            normalized = _normalize(prompt)
+        return hashlib.sha256(f"{llm_string}\n{normalized}".encode("utf-8")).hexdigest()
+
+    def _count(self, result: str):
+        with self._lock:
+            if result == "hit":
+                self.hits += 1
+            else:
+                self.misses += 1
+        LLM_CACHE_LOOKUPS.labels(_current_node(), result).inc()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[list]:
+        value = self.cache.get(self.key(prompt, llm_string))
+        if value is None:
+            self._count("miss")
+            return None
+        entry = json.loads(value)
+        if time.time() - entry["created_at"] > self.ttl_seconds:
+            self._count("expired")
+            return None
+        generations = loads(entry["generations"], allowed_objects=[Generation, ChatGeneration, AIMessage])
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            if message is not None:
+                message.response_metadata = {**message.response_metadata, "response_cached": True}
+        self._count("hit")
+        return generations
+
+    @staticmethod
+    def _storable(generation):
+        # Structured outputs carry the parsed pydantic object, which only survives serialization as a dict.
+        message = getattr(generation, "message", None)
+        parsed = message.additional_kwargs.get("parsed") if message is not None else None
+        if not isinstance(parsed, BaseModel):
+            return generation
+        additional_kwargs = {**message.additional_kwargs, "parsed": parsed.model_dump()}
+        return generation.model_copy(update={"message": message.model_copy(update={"additional_kwargs": additional_kwargs})})
+
+    def update(self, prompt: str, llm_string: str, return_val: list):
+        entry = {"created_at": time.time(), "generations": dumps([self._storable(generation) for generation in return_val])}
+        self.cache.set(self.key(prompt, llm_string), json.dumps(entry).encode("utf-8"))
+
+    def clear(self, **kwargs: Any):
+        self.cache.clear()
+
+    def stats(self) -> dict:
+        """Returns hits and misses, expired entries included, and the store's size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": self.cache.stats()["entries"],
+        }
+
+
+class NodeModels:
+    """Hands each node either the plain model or a copy that reads and fills the response cache.
+
+    Only the nodes listed in `cached_nodes` (the `LLM_CACHE_NODES`
+    environment variable, comma-separated) get the cached copy. The copy
+    shares the original's HTTP clients and callbacks.
+    """
+
+    def __init__(self, llm, cache: Optional[BaseCache] = None, cached_nodes: Optional[Iterable[str]] = None):
+        self.llm = llm
+        if cached_nodes is None:
+            configured = os.getenv("LLM_CACHE_NODES")
+            cached_nodes = configured.split(",") if configured is not None else DEFAULT_CACHED_NODES
+        self.cached_nodes = {node.strip() for node in cached_nodes if node.strip()}
+        self.cached_llm = llm.model_copy(update={"cache": cache}) if cache is not None else llm
+
+    def for_node(self, node: str):
+        return self.cached_llm if node in self.cached_nodes else self.llm
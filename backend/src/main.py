@@ -1,56 +1,114 @@
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException
+from fastapi.responses import Response, StreamingResponse
 from typing import List, Optional
+from contextlib import asynccontextmanager
 import os
+import json
 import uuid
+import asyncio
 
-from .graph import create_graph
-from .schemas import GenerationResponse
+from . import startup
+from .jobs import IngestionJobQueue, IngestionQueueFull
+from .schemas import GenerationResponse, IngestionJobStatus
+from .sessions import SessionStore
+from .instrumentation import TurnTrace, configure_logging, render_metrics
 
-app = FastAPI()
+configure_logging()
 
-# using in memory thread id management for now for the quick MVP - Deepak
-graphs = {}
-agents = {}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The graph is built, the search index provisioned and the section query
+    # vectors embedded in the background, so the server accepts connections
+    # right away; requests that need the graph wait in `startup.ready()`.
+    startup.start()
+    yield
+    await startup.shutdown()
+
+
+def _release_thread(thread_id: str):
+    graph = startup.loaded()
+    if graph is not None:
+        graph[1].release_thread(thread_id)
+
+
+async def _ingest(file_paths: List[str], thread_id: str, on_progress):
+    _, agent = await startup.ready()
+    return await agent.aprocess_pdfs(file_paths, thread_id, on_progress=on_progress)
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Conversation state lives in the graph checkpointer; this only bounds which
+# threads keep per-thread buffers in memory.
+sessions = SessionStore(on_evict=_release_thread)
+
+# Uploads are ingested in the background. A turn's retrieval waits only until
+# the first batch of its documents is searchable, up to INGESTION_WAIT_SECONDS,
+# and reads later batches on later turns as they land.
+ingestion_jobs = IngestionJobQueue(_ingest)
 
 UPLOAD_DIR = "uploaded_pdfs"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
 
-@app.post("/generate", response_model=GenerationResponse)
-async def generate(
-    prompt: str = Form(...),
-    files: Optional[List[UploadFile]] = File(None),
-    thread_id: Optional[str] = Form(None),
-):
+
+def _queue_full() -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="Too many documents are being processed. Please retry shortly.",
+        headers={"Retry-After": os.getenv("INGESTION_RETRY_AFTER_SECONDS", "10")},
+    )
+
+
+async def _save_upload(file: UploadFile, path: str):
+    """Copies an upload to disk in fixed-size chunks, writing off the event loop."""
+    with open(path, "wb") as buffer:
+        while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+            await asyncio.to_thread(buffer.write, chunk)
+
+
+async def _prepare_run(prompt: str, files: Optional[List[UploadFile]], thread_id: Optional[str]):
     """
-    Single endpoint to handle document generation. It supports PDF uploads
-    on the initial call and manages an interactive conversation with the
-    LangGraph agent.
+    Resolves the shared graph for the thread, queues any uploads on the
+    initial call for background ingestion and returns what the graph should
+    be run with.
+
+    Returns:
+        tuple: (graph, config, graph input, thread id, ingestion job id)
     """
-    if thread_id and thread_id not in graphs:
+    app_instance, agent = await startup.ready()
+
+    if thread_id and thread_id not in sessions and not (await app_instance.aget_state({"configurable": {"thread_id": thread_id}})).values:
         raise HTTPException(
             status_code=404, detail="Thread ID not found. Please start a new conversation."
         )
 
-    config = {}
-    app_instance = None
-
     if not thread_id:
+        if files and ingestion_jobs.full():
+            raise _queue_full()
+
         thread_id = str(uuid.uuid4())
-        app_instance, agent_instance = create_graph()
-        graphs[thread_id] = app_instance
-        agents[thread_id] = agent_instance
+        sessions.touch(thread_id)
         config = {"configurable": {"thread_id": thread_id}}
 
+        file_paths, job_id = [], None
         if files:
-            file_paths = []
             for file in files:
-                file_path = os.path.join(UPLOAD_DIR, f"{thread_id}_{file.filename}")
-                with open(file_path, "wb") as buffer:
-                    buffer.write(await file.read())
+                file_path = os.path.join(UPLOAD_DIR, f"{thread_id}_{os.path.basename(file.filename)}")
+                await _save_upload(file, file_path)
                 file_paths.append(file_path)
-            
-            agent_instance.process_pdfs(file_paths, thread_id)
+
+            # Registered before queueing, so the turn's retrieval waits for the job's first batch.
+            agent.expect_ingestion(thread_id)
+            try:
+                job_id = ingestion_jobs.submit(thread_id, file_paths).id
+            except IngestionQueueFull:
+                agent.end_ingestion(thread_id)
+                for file_path in file_paths:
+                    os.remove(file_path)
+                raise _queue_full()
 
         required_info = [
             "the full name of the client",
@@ -60,41 +118,138 @@ async def generate(
             "a clear description of the client's proposed work/project in the U.S.",
             "at least two specific examples of the client's key achievements and contributions"
         ]
-        
+
         initial_state = {
             "request": prompt,
             "required_info": required_info,
             "thread_id": thread_id,
+            "files": file_paths,
         }
-        
-        app_instance.invoke(initial_state, config)
+        return app_instance, config, initial_state, thread_id, job_id
 
-    else:
-        app_instance = graphs[thread_id]
-        config = {"configurable": {"thread_id": thread_id}}
-        app_instance.update_state(config, {"user_provided_info": prompt})
-        app_instance.invoke(None, config)
+    sessions.touch(thread_id)
+    config = {"configurable": {"thread_id": thread_id}}
+    await app_instance.aupdate_state(config, {"user_provided_info": prompt})
+    return app_instance, config, None, thread_id, None
+
+
+def _pending_note(job_id: Optional[str]) -> str:
+    job = ingestion_jobs.get(job_id) if job_id else None
+    if job is None or job.finished:
+        return ""
+    return f" Your documents are still being processed; follow /jobs/{job_id} for progress."
+
+
+async def _build_response(app_instance, config, thread_id: str, job_id: Optional[str] = None) -> GenerationResponse:
+    current_state = await app_instance.aget_state(config)
+    note = _pending_note(job_id)
 
-    current_state = app_instance.get_state(config)
-    
     if current_state.next:
         missing_fields = current_state.values.get('missing_fields', [])
         response_prompt = f"To generate a high-quality LOR, I need more information. Please provide details on: {', '.join(missing_fields)}"
         return GenerationResponse(
             thread_id=thread_id,
-            response=response_prompt,
-            status="requires_input"
+            response=response_prompt + note,
+            status="requires_input",
+            ingestion_job_id=job_id,
         )
     else:
         final_doc = current_state.values.get('generated_document')
         return GenerationResponse(
             thread_id=thread_id,
-            response="Document generation is complete.",
+            response="Document generation is complete." + note,
             status="complete",
-            document=final_doc
+            document=final_doc,
+            ingestion_job_id=job_id,
         )
 
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/generate", response_model=GenerationResponse)
+async def generate(
+    prompt: str = Form(...),
+    files: Optional[List[UploadFile]] = File(None),
+    thread_id: Optional[str] = Form(None),
+):
+    """
+    Single endpoint to handle document generation. It supports PDF uploads
+    on the initial call and manages an interactive conversation with the
+    LangGraph agent. Uploads are ingested by a background job whose id is
+    returned as `ingestion_job_id`; a full ingestion queue answers 429.
+    """
+    app_instance, config, graph_input, thread_id, job_id = await _prepare_run(prompt, files, thread_id)
+    await app_instance.ainvoke(graph_input, {**config, "callbacks": [TurnTrace()]})
+    return await _build_response(app_instance, config, thread_id, job_id)
+
+
+@app.post("/generate/stream")
+async def generate_stream(
+    prompt: str = Form(...),
+    files: Optional[List[UploadFile]] = File(None),
+    thread_id: Optional[str] = Form(None),
+):
+    """
+    Server-sent events variant of `/generate`. Emits a `token` event for each
+    chunk of the letter as the model produces it, then a `done` event carrying
+    the same payload `/generate` would return.
+    """
+    app_instance, config, graph_input, thread_id, job_id = await _prepare_run(prompt, files, thread_id)
+
+    async def events():
+        async for chunk, metadata in app_instance.astream(graph_input, {**config, "callbacks": [TurnTrace()]}, stream_mode="messages"):
+            if metadata.get("langgraph_node") == "generate_document" and isinstance(chunk.content, str) and chunk.content:
+                yield _sse("token", {"content": chunk.content})
+        yield _sse("done", (await _build_response(app_instance, config, thread_id, job_id)).model_dump())
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+def _job_or_404(job_id: str):
+    job = ingestion_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ingestion job not found.")
+    return job
+
+
+@app.get("/jobs/{job_id}", response_model=IngestionJobStatus)
+async def job_status(job_id: str):
+    """Status, progress log and chunk counts of a background ingestion job."""
+    return IngestionJobStatus(**_job_or_404(job_id).to_dict())
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    Server-sent events of a background ingestion job: a `progress` event per
+    status line, including the ones already logged, then a `done` event with
+    the final status.
+    """
+    job = _job_or_404(job_id)
+
+    async def events():
+        async for message in job.events():
+            yield _sse("progress", {"message": message})
+        yield _sse("done", IngestionJobStatus(**job.to_dict()).model_dump())
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.get("/health")
+async def health():
+    """Liveness and readiness. Answers as soon as the server is up; `ready` turns true once the graph is built."""
+    return startup.status()
+
+
+@app.get("/metrics")
+def metrics():
+    """Per-node and per-model latency, token, cost and cache metrics in Prometheus text format."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000)
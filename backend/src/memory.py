@@ -0,0 +1,108 @@
+import logging
+import os
+from typing import Dict, List, Optional
+
+from backend.src.prompts import PromptFactory
+from backend.src.schemas import GraphState
+from backend.src.tokens import TokenCounter, tiktoken_counter
+
+logger = logging.getLogger(__name__)
+
+# Tokens of conversation each node may put in its prompt, summary included.
+NODE_TOKEN_BUDGETS = {
+    "master_router": 1000,
+    "retrieve_context": 400,
+    "context_completeness_check": 2500,
+    "generate_document": 3000,
+    "context_gatherer_agent": 2500,
+}
+
+
+class ConversationMemory:
+    """Token-budgeted view of the conversation with an incrementally updated summary.
+
+    Tokens are counted locally, with tiktoken unless another `token_counter`
+    is given. Each node renders the running
+    summary followed by as many of the newest messages as fit in its budget.
+    Once the messages not yet covered by the summary exceed
+    `summary_trigger_tokens`, the oldest of them are folded into the summary
+    with one model call, keeping about `recent_tokens` of the newest turns
+    verbatim. The summary and how many messages it covers are stored on the
+    graph state, so each message is summarized once.
+    """
+
+    def __init__(
+        self,
+        llm=None,
+        node_budgets: Optional[Dict[str, int]] = None,
+        summary_trigger_tokens: int | None = None,
+        recent_tokens: int | None = None,
+        token_counter: Optional[TokenCounter] = None,
+    ):
+        self.llm = llm
+        self.node_budgets = {**NODE_TOKEN_BUDGETS, **(node_budgets or {})}
+        self.summary_trigger_tokens = summary_trigger_tokens or int(os.getenv("MEMORY_SUMMARY_TRIGGER_TOKENS", "1500"))
+        self.recent_tokens = recent_tokens or int(os.getenv("MEMORY_RECENT_TOKENS", "800"))
+        self.token_counter = token_counter or tiktoken_counter()
+        self.prompt_factory = PromptFactory()
+
+    def count_tokens(self, text: str) -> int:
+        return self.token_counter(text)
+
+    def _newest_within(self, messages: List[str], budget: int) -> List[str]:
+        kept, used = [], 0
+        for message in reversed(messages):
+            tokens = self.count_tokens(message) + 1
+            if used + tokens > budget:
+                break
+            kept.append(message)
+            used += tokens
+        return kept[::-1]
+
+    def render(self, state: GraphState, node: str) -> str:
+        """
+        Returns the conversation history for a node's prompt within its token budget.
+
+        Args:
+            state: The graph state holding the history and the running summary
+            node: The node the prompt is for, which selects the budget
+
+        Returns:
+            str: The summary of older turns followed by the newest messages that fit
+        """
+        history = state.get("conversation_history") or []
+        summary = state.get("history_summary") or ""
+        budget = self.node_budgets.get(node, min(self.node_budgets.values()))
+
+        parts = []
+        if summary:
+            summary_tokens = self.count_tokens(summary)
+            if summary_tokens < budget:
+                parts.append(f"Summary of earlier conversation: {summary}")
+                budget -= summary_tokens
+        parts.extend(self._newest_within(history[state.get("summarized_upto") or 0:], budget))
+        return "\n".join(parts)
+
+    def _pending_fold(self, state: GraphState) -> List[str]:
+        """Returns the oldest unsummarized messages once they outgrow the trigger, keeping the newest verbatim."""
+        pending = (state.get("conversation_history") or [])[state.get("summarized_upto") or 0:]
+        if self.llm is None or sum(self.count_tokens(message) + 1 for message in pending) <= self.summary_trigger_tokens:
+            return []
+        recent = self._newest_within(pending, self.recent_tokens)
+        return pending[:len(pending) - len(recent)]
+
+    async def aupdate(self, state: GraphState) -> dict:
+        """
+        Folds older messages into the running summary once the unsummarized
+        part of the history outgrows the trigger.
+
+        Returns:
+            dict: `history_summary` and `summarized_upto` updates, or nothing when no update was needed
+        """
+        to_fold = self._pending_fold(state)
+        if not to_fold:
+            return {}
+        prompt = self.prompt_factory.get_prompt("summary", state.get("history_summary") or "", "\n".join(to_fold))
+        summary = (await self.llm.ainvoke(prompt)).content.strip()
+        logger.info(f"Folded {len(to_fold)} messages into the conversation summary ({self.count_tokens(summary)} tokens)")
+        return {"history_summary": summary, "summarized_upto": (state.get("summarized_upto") or 0) + len(to_fold)}
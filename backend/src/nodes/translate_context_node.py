@@ -1,32 +1,33 @@
+import logging
 import os
-import json
-
-from langchain_openai import ChatOpenAI
 
 from backend.src.schemas import GraphState
-from backend.src.prompts import PromptFactory
+from backend.src.translation import ChunkTranslator
+from backend.src.clients import get_chat_model, get_translator
+
+logger = logging.getLogger(__name__)
 
 
 class TranslateContextNode:
     """Node responsible for translating retrieved context into English.
 
     Uses a faster OpenAI chat model specifically for translation to reduce latency
-    without impacting the rest of the pipeline's model choices.
+    without impacting the rest of the pipeline's model choices. Chunks ingested
+    with an English copy in their metadata are used as-is, and the rest go
+    through the cached `ChunkTranslator`, so the model is only called for
+    chunks that were never translated before.
     """
 
-    def __init__(self, model_name: str | None = None):
-        openai_api_key = os.getenv("OPENAI_API_KEY")
-        if not openai_api_key:
-            raise ValueError("OPENAI_API_KEY environment variable not set.")
-
-        self.llm = ChatOpenAI(
-            openai_api_key=openai_api_key,
-            model_name=model_name or os.getenv("TRANSLATION_MODEL_NAME", "gpt-4o-mini")
-        )
-
-        self.prompt_factory = PromptFactory()
+    def __init__(self, model_name: str | None = None, max_concurrency: int | None = None, translator: ChunkTranslator | None = None):
+        if translator is None:
+            if model_name or max_concurrency:
+                translator = ChunkTranslator(get_chat_model(model_name or os.getenv("TRANSLATION_MODEL_NAME", "gpt-4o-mini")), max_concurrency=max_concurrency)
+            else:
+                translator = get_translator()
+        self.translator = translator
+        self.llm = translator.llm
 
-    def execute(self, state: GraphState):
+    async def execute(self, state: GraphState):
         """Translate accumulated context into English and persist on state.
 
         Args:
@@ -35,31 +36,21 @@ class TranslateContextNode:
         Returns:
             Updated state with `translated_context` set.
         """
-        print("---TRANSLATING CONTEXT TO ENGLISH ---")
+        logger.info("---TRANSLATING CONTEXT TO ENGLISH ---")
         context = state.get("retrieved_context", [])
 
         if not context:
-            print("No context to translate")
+            logger.info("No context to translate")
             state["translated_context"] = ""
             return state
 
-        context_text = " ".join([doc["page_content"] for doc in context])
-        prompt = self.prompt_factory.get_prompt("translation", context_text)
+        texts = [doc["metadata"].get("content_en") for doc in context]
+        pending = [i for i, text in enumerate(texts) if text is None]
+        logger.info(f"{len(texts) - len(pending)} of {len(texts)} chunks have an English copy from ingestion")
+        if pending:
+            translations = await self.translator.atranslate([context[i]["page_content"] for i in pending])
+            for i, translation in zip(pending, translations):
+                texts[i] = translation
 
-        response = self.llm.invoke(prompt)
-        print("Raw response (translation): ", response.content)
-
-        try:
-            parsed = json.loads(response.content)
-            if isinstance(parsed, dict) and "translated_text" in parsed:
-                translated_text = parsed["translated_text"]
-            else:
-                translated_text = response.content
-        except json.JSONDecodeError:
-            print("JSON parsing failed, using raw response")
-            translated_text = response.content
-
-        state["translated_context"] = translated_text
+        state["translated_context"] = " ".join(texts)
         return state
-
-
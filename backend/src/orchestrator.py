@@ -1,43 +1,61 @@
-import os
-from langchain_openai import ChatOpenAI
-from dotenv import load_dotenv
+import logging
 
 from backend.src.schemas import GraphState
 from backend.src.prompts import PromptFactory
+from backend.src.router import FastPathRouter
+from backend.src.clients import get_chat_model, get_conversation_memory, get_embeddings, get_llm_cache
+from backend.src.llm_cache import NodeModels
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
 class OrchestratorAgent:
-    def __init__(self):
-        openai_api_key = os.getenv("OPENAI_API_KEY")
-        if not openai_api_key:
-            raise ValueError("OPENAI_API_KEY environment variable not set.")
-        
-        self.llm = ChatOpenAI(openai_api_key=openai_api_key, model_name="gpt-5-2025-08-07")
+    def __init__(self, llm=None, embeddings=None, memory=None, response_cache=None):
+        self.llm = llm or get_chat_model()
+        self.models = NodeModels(self.llm, response_cache or get_llm_cache())
+        self.embeddings = embeddings or get_embeddings()
+        self.memory = memory or get_conversation_memory()
+        self.fast_path = FastPathRouter(self.embeddings)
         self.prompt_factory = PromptFactory()
 
-    def master_router(self, state: GraphState):
+    async def master_router(self, state: GraphState):
         """
-        The master router for the graph.
+        The master router for the graph. Clear-cut turns are routed locally by
+        the fast path; the LLM is only asked when it is not confident. The
+        chosen route and the path that decided it are recorded on the state.
+        As the entry node it also brings the conversation summary up to date
+        for the nodes that follow.
         """
-        print("---MASTER ROUTER---")
-        conversation_history = state.get("conversation_history", [])
+        logger.info("---MASTER ROUTER---")
+        memory_update = await self.memory.aupdate(state)
+        state = {**state, **memory_update}
+        decision = await self.fast_path.aroute(state)
+        if decision:
+            route, route_source = decision
+        else:
+            route, route_source = await self._route_with_llm(state), "llm"
+
+        logger.info(f"---ROUTING TO {route.upper()} (decided by {route_source})---")
+        return {
+            **memory_update,
+            "route": route,
+            "route_source": route_source,
+            "routed_files": list(state.get("files") or []),
+        }
+
+    async def _route_with_llm(self, state: GraphState) -> str:
         request = state["request"]
         files = state.get("files", [])
 
-        history_str = "\n".join(conversation_history)
+        history_str = self.memory.render(state, "master_router")
 
-        prompt = self.prompt_factory.get_prompt("master_router").format(
-            history=history_str, request=request, files=files
+        prompt = self.prompt_factory.get_prompt(
+            "master_router", history=history_str, request=request, files=files
         )
-        response = self.llm.invoke(prompt)
-        print("Orchestrator Response: ", response.content)
+        response = await self.models.for_node("master_router").ainvoke(prompt)
+        logger.debug("Orchestrator response: %s", response.content)
         if "retrieve_context" in response.content.lower():
-            print("---ROUTING TO RETRIEVE CONTEXT---")
             return "retrieve_context"
         elif "context_completeness_check" in response.content.lower():
-            print("---ROUTING TO CONTEXT COMPLETENESS CHECK---")
             return "context_completeness_check"
         else:
-            print("---ROUTING TO CONTEXT GATHERER AGENT---")
             return "context_gatherer_agent"
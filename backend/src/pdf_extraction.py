@@ -0,0 +1,38 @@
+"""Worker-side PDF text extraction.
+
+Functions here run inside the ingestion process pool, so this module only
+depends on `pypdf` to keep worker start-up cheap.
+"""
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+
+from pypdf import PdfReader
+
+PARSE_WORKERS = int(os.getenv("INGESTION_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_pool = None
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """Returns the process-wide pool used for PDF parsing, creating it on first use."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def count_pages(file_path: str) -> int:
+    return len(PdfReader(file_path).pages)
+
+
+def extract_pages(file_path: str, start: int, end: int) -> Tuple[str, List[Tuple[int, str]]]:
+    """
+    Extracts the text of pages `start` (inclusive) to `end` (exclusive).
+
+    Returns:
+        Tuple[str, List[Tuple[int, str]]]: The file path and (page number, text) pairs
+    """
+    reader = PdfReader(file_path)
+    return file_path, [(page, reader.pages[page].extract_text()) for page in range(start, end)]
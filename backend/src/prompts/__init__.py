@@ -1,11 +1,24 @@
+from typing import Dict, List, Union
+
+from langchain_core.messages import BaseMessage
+
 from .routing_prompt import get_routing_prompt
 from .conversation_prompt import get_conversation_prompt
 from .context_completeness_prompt import create_context_completeness_prompt
 from .translation_prompt import generate_translation_prompt
-from .lorSystemPrompt import RETRIEVAL_QUERY_TEMPLATE, generate_LOR_prompt
+from .lorSystemPrompt import RETRIEVAL_QUERY_TEMPLATE, RETRIEVAL_SECTIONS, generate_LOR_prompt
 from .master_router_prompt import master_router_prompt
+from .summary_prompt import generate_summary_prompt
 
 class PromptFactory:
+    """Looks up prompts by name.
+
+    Chat prompts are `ChatPromptTemplate`s compiled once at import and come
+    back as a system message with the static instructions followed by a user
+    message with the per-call content, so the instructions form a stable
+    prefix the provider can cache across calls.
+    """
+
     def __init__(self):
         self.prompts = {
             "routing": get_routing_prompt,
@@ -14,10 +27,12 @@ class PromptFactory:
             "translation": generate_translation_prompt,
             "lor_system": generate_LOR_prompt,
             "retrieval_query": lambda: RETRIEVAL_QUERY_TEMPLATE,
-            "master_router": lambda: master_router_prompt,
+            "retrieval_sections": lambda: RETRIEVAL_SECTIONS,
+            "master_router": master_router_prompt.format_messages,
+            "summary": generate_summary_prompt,
         }
 
-    def get_prompt(self, prompt_name: str, *args, **kwargs) -> str:
+    def get_prompt(self, prompt_name: str, *args, **kwargs) -> Union[List[BaseMessage], Dict[str, str], str]:
         """
         Get a prompt by name and format it with the provided arguments.
         
@@ -27,7 +42,8 @@ class PromptFactory:
             **kwargs: Keyword arguments to pass to the prompt function
         
         Returns:
-            str: The formatted prompt
+            List[BaseMessage] | Dict[str, str] | str: The system/user messages of a chat prompt,
+            the retrieval section queries, or the text of a plain template
             
         Raises:
             ValueError: If the prompt name is not found in the factory
@@ -1,11 +1,9 @@
+from typing import List
 
-def create_context_completeness_prompt(history, query, context, client_name=None, client_pronouns=None, client_endeavor=None, client_gender=None):
-    client_name = client_name or "Not provided"
-    client_pronouns = client_pronouns or "Not provided"
-    client_endeavor = client_endeavor or "Not provided"
-    client_gender = client_gender or "Not provided"
+from langchain_core.messages import BaseMessage
+from langchain_core.prompts import ChatPromptTemplate
 
-    base_prompt = f"""
+CONTEXT_COMPLETENESS_INSTRUCTIONS = """
 You are helping determine whether enough information has been gathered to draft a Letter of Recommendation (LOR) for a client.
 You should focus on the user query and the retrieved context to determine the missing fields. If there is a conflict between the user query and the retrieved context, you should prioritize the user query.
 
@@ -13,13 +11,6 @@ You should focus on the user query and the retrieved context to determine the mi
 - Client's Full Name
 - Client's Pronouns
 
-## Provided Information:
-- Client Name: {client_name}
-- Client Pronouns: {client_pronouns}
-- Client Gender: {client_gender}
-- Client Endeavor: {client_endeavor}
-
-
 IMPORTANT : If the client name and the client pronouns are available then the missing fields should be empty and the follow up question should be empty.
 Analyze the context and conversation history step by step to get whether the client name and the client pronouns are available.
 
@@ -38,11 +29,19 @@ If no fields are missing, return:
   "missing_fields": [],
   "follow_up_question": ""
 }}
-"""
+""".strip()
 
-    if client_name == "Not provided" or client_pronouns == "Not provided":
-        base_prompt += f"""
+PROVIDED_INFORMATION = """
+## Provided Information:
+- Client Name: {client_name}
+- Client Pronouns: {client_pronouns}
+- Client Gender: {client_gender}
+- Client Endeavor: {client_endeavor}
+"""
 
+incomplete_template = ChatPromptTemplate.from_messages([
+    ("system", CONTEXT_COMPLETENESS_INSTRUCTIONS),
+    ("human", (PROVIDED_INFORMATION + """
 ## Additional Context:
 Conversation History:
 {history}
@@ -52,17 +51,35 @@ User's Query:
 
 Retrieved Context:
 {context}
-"""
-
-    else:
-        base_prompt += f"""
+""").strip()),
+])
 
+complete_template = ChatPromptTemplate.from_messages([
+    ("system", CONTEXT_COMPLETENESS_INSTRUCTIONS),
+    ("human", (PROVIDED_INFORMATION + """
 ## User's Query:
 {query}
 
 
 Retrieved Context:
 {context}
-"""
+""").strip()),
+])
+
+def create_context_completeness_prompt(history, query, context, client_name=None, client_pronouns=None, client_endeavor=None, client_gender=None) -> List[BaseMessage]:
+    client_name = client_name or "Not provided"
+    client_pronouns = client_pronouns or "Not provided"
+    client_endeavor = client_endeavor or "Not provided"
+    client_gender = client_gender or "Not provided"
 
-    return base_prompt.strip()
\ No newline at end of file
+    # The conversation history is only needed while the name or pronouns are still unknown.
+    template = incomplete_template if client_name == "Not provided" or client_pronouns == "Not provided" else complete_template
+    return template.format_messages(
+        history=history,
+        query=query,
+        context=context,
+        client_name=client_name,
+        client_pronouns=client_pronouns,
+        client_gender=client_gender,
+        client_endeavor=client_endeavor,
+    )
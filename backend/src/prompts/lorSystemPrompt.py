@@ -1,3 +1,8 @@
+from typing import List
+
+from langchain_core.messages import BaseMessage
+from langchain_core.prompts import ChatPromptTemplate
+
 RETRIEVAL_QUERY_TEMPLATE = """
 Based on the user's request, retrieve comprehensive information to draft a Letter of Recommendation for an EB-2 NIW petition. The letter requires details on:
 
@@ -37,12 +42,20 @@ Based on the user's request, retrieve comprehensive information to draft a Lette
 Retrieve all relevant text segments from the documents that address these points to build a complete profile for the Letter of Recommendation.
 """
 
+# One focused search per section of RETRIEVAL_QUERY_TEMPLATE. Spanish terms
+# are included because many uploaded questionnaires are in Spanish.
+RETRIEVAL_SECTIONS = {
+    "recommender_credentials": "Recommender's full name (nombre completo), current title, professional expertise, education, degrees, institutions and professional experience.",
+    "relationship": "How the recommender knows the candidate: collaboration, supervision, colleagues; their professional relationship (relación profesional).",
+    "us_initiative": "The candidate's proposed project or work in the United States (iniciativa, proyecto en Estados Unidos), its methodologies, tools and technologies.",
+    "achievements": "The candidate's key achievements (logros): the challenge, the candidate's role and methods, and quantifiable results or impact.",
+    "national_importance": "Broader impact and national importance of the candidate's work; alignment with U.S. priorities such as economic growth, innovation, sustainability or public health.",
+    "qualifications": "Why the candidate is well qualified and ready to carry out the proposed initiative; evidence of capability and experience.",
+    "identity": "The candidate's full name (nombre completo del candidato) and pronouns (pronombres), such as he/him, she/her or they/them.",
+}
 
-def generate_LOR_prompt(
-    full_context : str
-):
 
-    prompt = f"""
+LOR_SYSTEM_INSTRUCTIONS = """
 Role Overview:
 You are an expert legal-writing assistant specializing in drafting Letters of Recommendation (LOR) for EB-2 NIW immigration petitions.
 
@@ -114,7 +127,9 @@ The provided context contains information about both the Candidate and the Recom
 2.  **Recommender Information (The person writing the letter):**
     *   Identify the individual who is in a position to recommend the Candidate.
     *   Look for their professional background, credentials, title, and the description of their relationship with the Candidate.
+""".strip()
 
+LOR_REQUEST_TEMPLATE = """
 Context for Letter Generation:
 {full_context}
 
@@ -122,6 +137,17 @@ Based on the above context, extract all relevant information, correctly identify
 
 NOTE: 
 Do not include a header with the recommender's address or any other placeholder text like [Your Name] or [Your Title]. Begin the letter directly with the salutation (e.g., "To Whom It May Concern,").
-"""
+""".strip()
 
-    return prompt.strip()
+# The long instructions are the system message so every letter request shares
+# the same prefix and the provider can serve it from its prompt cache.
+lor_template = ChatPromptTemplate.from_messages([
+    ("system", LOR_SYSTEM_INSTRUCTIONS),
+    ("human", LOR_REQUEST_TEMPLATE),
+])
+
+
+def generate_LOR_prompt(
+    full_context : str
+) -> List[BaseMessage]:
+    return lor_template.format_messages(full_context=full_context)
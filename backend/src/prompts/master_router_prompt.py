@@ -1,6 +1,6 @@
 from langchain_core.prompts import ChatPromptTemplate
 
-master_router_template = """
+master_router_instructions = """
 You are the master router for a document generation agent. Your job is to analyze the conversation and route the user to the correct tool.
 
 **Required Information for Document Generation:**
@@ -17,6 +17,10 @@ You are the master router for a document generation agent. Your job is to analyz
 
 3.  **`context_gatherer_agent`**: This is the default path. Choose this path if **any** of the four required pieces of information are missing from the conversation history, or if the user is asking a general question.
 
+Based on a strict analysis of the conversation history, which route must be taken?
+""".strip()
+
+master_router_template = """
 **Analysis:**
 
 - User Request: "{request}"
@@ -25,8 +29,9 @@ You are the master router for a document generation agent. Your job is to analyz
 <conversation_history>
 {history}
 </conversation_history>
+""".strip()
 
-Based on a strict analysis of the conversation history, which route must be taken?
-"""
-
-master_router_prompt = ChatPromptTemplate.from_template(master_router_template)
+master_router_prompt = ChatPromptTemplate.from_messages([
+    ("system", master_router_instructions),
+    ("human", master_router_template),
+])
@@ -1,6 +1,23 @@
-from typing import Optional
+from typing import List, Optional
 
-def get_routing_prompt(request: str, conversation_history: Optional[str] = None) -> str:
+from langchain_core.messages import BaseMessage
+from langchain_core.prompts import ChatPromptTemplate
+
+ROUTING_INSTRUCTIONS = (
+    "You are an expert legal-writing assistant specializing in drafting professional Letters of Recommendation (LORs) for EB-2 National Interest Waiver (NIW) immigration petitions, collaborating with Colombo & Hurd. Your core task is to guide users through a structured, compliant workflow for LOR production."
+    "Determine the user’s intent: document generation, information request, or general question"
+    "If the we have the enough context to generate the documentation then we should move to the document generation process."
+    "If the user is asking a general question, respond with 'conversational_agent'."
+    "The document generation process is about creating a letter of recommendation."
+    "NOTE: Do consider the conversation history to determine the user's intent."
+)
+
+routing_template = ChatPromptTemplate.from_messages([
+    ("system", ROUTING_INSTRUCTIONS),
+    ("human", "User Request: {request}\n-------------------------------------------------\nConversation History: {conversation_history}"),
+])
+
+def get_routing_prompt(request: str, conversation_history: Optional[str] = None) -> List[BaseMessage]:
     """
     Generates the prompt for routing user requests between conversation and document generation.
     
@@ -9,19 +26,9 @@ def get_routing_prompt(request: str, conversation_history: Optional[str] = None)
         conversation_history: Optional string containing the conversation history
     
     Returns:
-        str: The formatted routing prompt
+        List[BaseMessage]: The static instructions as a system message, then the request and history
     """
-    return (
-        "You are an expert legal-writing assistant specializing in drafting professional Letters of Recommendation (LORs) for EB-2 National Interest Waiver (NIW) immigration petitions, collaborating with Colombo & Hurd. Your core task is to guide users through a structured, compliant workflow for LOR production."
-        "Determine the user’s intent: document generation, information request, or general question"
-        "If the we have the enough context to generate the documentation then we should move to the document generation process."
-        "If the user is asking a general question, respond with 'conversational_agent'."
-        "The document generation process is about creating a letter of recommendation."
-        "NOTE: Do consider the conversation history to determine the user's intent."
-        
-
-
-        f"User Request: {request}\n"
-        "-------------------------------------------------"
-        f"Conversation History: {conversation_history if conversation_history else 'No previous conversation'}"
-    )
\ No newline at end of file
+    return routing_template.format_messages(
+        request=request,
+        conversation_history=conversation_history if conversation_history else 'No previous conversation',
+    )
@@ -0,0 +1,27 @@
+from typing import List
+
+from langchain_core.messages import BaseMessage
+from langchain_core.prompts import ChatPromptTemplate
+
+SUMMARY_INSTRUCTIONS = """
+You maintain a running summary of a conversation between a user and an assistant that drafts letters of recommendation.
+
+TASK:
+Update the summary with the new messages you are given. Keep every fact that matters for writing the letter:
+the client's name, pronouns and gender, the recommender's credentials and relationship to the client,
+the proposed endeavor, achievements, dates, numbers and any instructions the user gave about the letter.
+Drop greetings and small talk. Write in the same language the facts were given in.
+
+Return only the updated summary as plain text.
+""".strip()
+
+summary_template = ChatPromptTemplate.from_messages([
+    ("system", SUMMARY_INSTRUCTIONS),
+    ("human", "CURRENT SUMMARY:\n---\n{previous_summary}\n---\n\nNEW MESSAGES:\n---\n{new_messages}\n---"),
+])
+
+def generate_summary_prompt(previous_summary: str, new_messages: str) -> List[BaseMessage]:
+    """Generates the prompt for folding older conversation turns into the running summary."""
+    return summary_template.format_messages(
+        previous_summary=previous_summary or "No summary yet.", new_messages=new_messages
+    )
@@ -1,11 +1,13 @@
-def generate_translation_prompt(text_to_translate: str) -> str:
-    """Generates the prompt for translating text to English."""
-    
-    prompt = f"""
+from typing import List
+
+from langchain_core.messages import BaseMessage
+from langchain_core.prompts import ChatPromptTemplate
+
+TRANSLATION_INSTRUCTIONS = """
 You are a translation assistant that MUST return responses in a specific JSON format.
 
 TASK:
-1. Translate the following text to English
+1. Translate the text given by the user to English
 2. If the text is already in English, return it unchanged
 3. Return ONLY a JSON object with this exact structure: {{"translated_text": "your translation here"}}
 
@@ -15,12 +17,15 @@ RULES:
 - Do not add comments, explanations, or any other content
 - Ensure all quotes are properly escaped in the translation
 
-INPUT TEXT:
----
-{text_to_translate}
----
-
 RESPONSE FORMAT:
 {{"translated_text": "your translation here"}}
-"""
-    return prompt.strip() 
\ No newline at end of file
+""".strip()
+
+translation_template = ChatPromptTemplate.from_messages([
+    ("system", TRANSLATION_INSTRUCTIONS),
+    ("human", "INPUT TEXT:\n---\n{text_to_translate}\n---"),
+])
+
+def generate_translation_prompt(text_to_translate: str) -> List[BaseMessage]:
+    """Generates the prompt for translating text to English."""
+    return translation_template.format_messages(text_to_translate=text_to_translate)
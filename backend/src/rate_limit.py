@@ -0,0 +1,434 @@
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from backend.src.instrumentation import RATE_LIMIT_RETRIES, RATE_LIMIT_WAIT, RATE_LIMIT_WAITING
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+# Requests and tokens per minute, matched by model name prefix, longest first.
+# Entries in OPENAI_RATE_LIMITS ("model=rpm/tpm,...") override these.
+DEFAULT_LIMITS = {
+    "gpt-5": (500, 500_000),
+    "gpt-4o-mini": (500, 200_000),
+    "text-embedding-3": (3_000, 1_000_000),
+}
+FALLBACK_LIMITS = (500, 200_000)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_POLL_SECONDS = 1.0
+
+_priority: ContextVar[str] = ContextVar("openai_priority", default=INTERACTIVE)
+_caller_backoff: ContextVar[bool] = ContextVar("openai_caller_backoff", default=False)
+
+
+@contextmanager
+def priority(name: str):
+    """
+    Tags the OpenAI calls made inside the block with a priority class. Tasks
+    and worker threads started inside the block inherit the tag.
+    """
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+@contextmanager
+def caller_backoff():
+    """
+    Hands 429s from the OpenAI calls made inside the block straight back to
+    the caller as `openai.RateLimitError`, for callers that back off better
+    themselves, e.g. by shrinking their batches. The model is still paused
+    for everyone else.
+    """
+    token = _caller_backoff.set(True)
+    try:
+        yield
+    finally:
+        _caller_backoff.reset(token)
+
+
+def parse_limits(value: str) -> Dict[str, Tuple[int, int]]:
+    limits = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        model, _, rates = item.partition("=")
+        rpm, _, tpm = rates.partition("/")
+        limits[model.strip()] = (int(rpm), int(tpm))
+    return limits
+
+
+class TokenBucket:
+    """Capacity that refills continuously at `capacity` per minute. The governor serializes access."""
+
+    def __init__(self, capacity: float):
+        self.capacity = capacity
+        self.rate = capacity / 60.0
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float, floor: float = 0.0) -> float:
+        """Seconds until `amount` can be taken with at least `floor` left over."""
+        return max(0.0, (amount + floor - self.level) / self.rate)
+
+
+class _ModelBudget:
+    def __init__(self, rpm: int, tpm: int):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.paused_until = 0.0
+        self.waiting = {INTERACTIVE: 0, BACKGROUND: 0}
+
+
+class RateLimitGovernor:
+    """Process-wide request and token budget per OpenAI model.
+
+    Every OpenAI request takes one request and its estimated tokens from the
+    model's per-minute buckets before it is sent, and waits while either is
+    short. Background requests (ingestion) also wait while any interactive
+    request for the model is waiting, and never take the last
+    `background_reserve` share of either bucket, so routing and generation
+    keep headroom while documents are embedded in bulk. Once a response
+    reports its usage, the estimate is corrected. A 429 pauses the model for
+    every caller, so one rate-limited request does not set off retries from
+    all the others.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[int, int]]] = None, background_reserve: float | None = None):
+        self.limits = limits or {**DEFAULT_LIMITS, **parse_limits(os.getenv("OPENAI_RATE_LIMITS", ""))}
+        self.background_reserve = (
+            background_reserve if background_reserve is not None else float(os.getenv("OPENAI_BACKGROUND_RESERVE", "0.2"))
+        )
+        self._budgets: Dict[str, _ModelBudget] = {}
+        self._lock = threading.Lock()
+
+    def _budget(self, model: str) -> _ModelBudget:
+        budget = self._budgets.get(model)
+        if budget is None:
+            limits = next(
+                (self.limits[prefix] for prefix in sorted(self.limits, key=len, reverse=True) if model.startswith(prefix)),
+                FALLBACK_LIMITS,
+            )
+            budget = self._budgets[model] = _ModelBudget(*limits)
+        return budget
+
+    def _try_acquire(self, model: str, tokens: int, priority: str) -> Tuple[float, int]:
+        """Returns (0, tokens taken) when the request may go now, else (seconds to wait, 0)."""
+        now = time.monotonic()
+        with self._lock:
+            budget = self._budget(model)
+            if now < budget.paused_until:
+                return budget.paused_until - now, 0
+            if priority == BACKGROUND and budget.waiting[INTERACTIVE]:
+                return MAX_POLL_SECONDS, 0
+            reserve = self.background_reserve if priority == BACKGROUND else 0.0
+            budget.requests.refill(now)
+            budget.tokens.refill(now)
+            # A request larger than the bucket would never fit; it goes once the bucket is full.
+            tokens = int(min(tokens, budget.tokens.capacity * (1 - reserve)))
+            wait = max(
+                budget.requests.wait_for(1, budget.requests.capacity * reserve),
+                budget.tokens.wait_for(tokens, budget.tokens.capacity * reserve),
+            )
+            if wait > 0:
+                return wait, 0
+            budget.requests.level -= 1
+            budget.tokens.level -= tokens
+            return 0.0, tokens
+
+    def _waiting(self, model: str, priority: str, change: int):
+        with self._lock:
+            self._budget(model).waiting[priority] += change
+        RATE_LIMIT_WAITING.labels(model, priority).inc(change)
+
+    async def acquire(self, model: str, tokens: int, priority: str | None = None) -> int:
+        """
+        Waits until the model has room for one request of about `tokens` tokens.
+
+        Args:
+            model: The OpenAI model name
+            tokens: Estimated prompt plus completion tokens
+            priority: `INTERACTIVE` or `BACKGROUND`; defaults to the caller's `priority` block
+
+        Returns:
+            int: The tokens taken, to pass to `settle` once the actual usage is known
+        """
+        priority = priority or current_priority()
+        started = time.monotonic()
+        wait, taken = self._try_acquire(model, tokens, priority)
+        if wait:
+            self._waiting(model, priority, 1)
+            try:
+                while wait:
+                    await asyncio.sleep(min(wait, MAX_POLL_SECONDS))
+                    wait, taken = self._try_acquire(model, tokens, priority)
+            finally:
+                self._waiting(model, priority, -1)
+        RATE_LIMIT_WAIT.labels(model, priority).observe(time.monotonic() - started)
+        return taken
+
+    def acquire_sync(self, model: str, tokens: int, priority: str | None = None) -> int:
+        """Blocking variant of `acquire` for calls made from worker threads."""
+        priority = priority or current_priority()
+        started = time.monotonic()
+        wait, taken = self._try_acquire(model, tokens, priority)
+        if wait:
+            self._waiting(model, priority, 1)
+            try:
+                while wait:
+                    time.sleep(min(wait, MAX_POLL_SECONDS))
+                    wait, taken = self._try_acquire(model, tokens, priority)
+            finally:
+                self._waiting(model, priority, -1)
+        RATE_LIMIT_WAIT.labels(model, priority).observe(time.monotonic() - started)
+        return taken
+
+    def settle(self, model: str, taken: int, used: int):
+        """Returns unused estimated tokens to the bucket, or takes the excess when the estimate was low."""
+        with self._lock:
+            budget = self._budget(model)
+            budget.tokens.level = min(budget.tokens.capacity, budget.tokens.level + taken - used)
+
+    def pause(self, model: str, seconds: float):
+        """Holds back every request for the model for `seconds`, e.g. after a 429."""
+        with self._lock:
+            budget = self._budget(model)
+            budget.paused_until = max(budget.paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                model: {
+                    "requests_available": round(budget.requests.level, 1),
+                    "tokens_available": round(budget.tokens.level),
+                    "waiting": dict(budget.waiting),
+                }
+                for model, budget in self._budgets.items()
+            }
+
+
+class _StreamedUsage:
+    """Passes a streamed completion through and settles the governor with the usage chunk at its end.
+
+    The usage chunk is only sent when the request asks for it
+    (`stream_options.include_usage`); without it the estimate stands.
+    """
+
+    TAIL_BYTES = 8192
+
+    def __init__(self, stream, governor: RateLimitGovernor, model: str, taken: int):
+        self.stream = stream
+        self.governor = governor
+        self.model = model
+        self.taken = taken
+        self._tail = b""
+        self._settled = False
+
+    def _observe(self, chunk: bytes):
+        self._tail = (self._tail + chunk)[-self.TAIL_BYTES:]
+
+    def _settle(self):
+        if self._settled:
+            return
+        self._settled = True
+        for line in reversed(self._tail.splitlines()):
+            if line.startswith(b"data:") and b'"usage"' in line:
+                try:
+                    used = int(json.loads(line[5:])["usage"]["total_tokens"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+                self.governor.settle(self.model, self.taken, used)
+                return
+
+
+class _SyncStreamedUsage(_StreamedUsage, httpx.SyncByteStream):
+    def __iter__(self):
+        for chunk in self.stream:
+            self._observe(chunk)
+            yield chunk
+        self._settle()
+
+    def close(self):
+        self.stream.close()
+
+
+class _AsyncStreamedUsage(_StreamedUsage, httpx.AsyncByteStream):
+    async def __aiter__(self):
+        async for chunk in self.stream:
+            self._observe(chunk)
+            yield chunk
+        self._settle()
+
+    async def aclose(self):
+        await self.stream.aclose()
+
+
+class _GovernedRequests:
+    """Request accounting and retry policy shared by the sync and async transports."""
+
+    def __init__(self, transport, governor: RateLimitGovernor, max_retries: int | None = None, completion_tokens: int | None = None):
+        self.transport = transport
+        self.governor = governor
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("OPENAI_MAX_RETRIES", "6"))
+        self.completion_tokens = completion_tokens or int(os.getenv("OPENAI_COMPLETION_TOKEN_ESTIMATE", "1000"))
+        self.base_delay = float(os.getenv("OPENAI_RETRY_BASE_SECONDS", "0.5"))
+        self.max_delay = float(os.getenv("OPENAI_RETRY_MAX_SECONDS", "30"))
+
+    def _describe(self, request: httpx.Request) -> Tuple[str, int, bool]:
+        """Returns the model, the estimated tokens and whether the response is streamed."""
+        try:
+            body = json.loads(request.content or b"{}")
+        except (httpx.RequestNotRead, ValueError):
+            body = {}
+        if not isinstance(body, dict):
+            body = {}
+        model = body.get("model", "unknown")
+        if request.url.path.endswith("/embeddings"):
+            inputs = body.get("input", [])
+            inputs = inputs if isinstance(inputs, list) and not all(isinstance(item, int) for item in inputs) else [inputs]
+            # LangChain sends token ids; plain strings are estimated at four characters per token.
+            tokens = sum(len(item) // 4 + 1 if isinstance(item, str) else len(item) for item in inputs)
+            return model, tokens, False
+        prompt = json.dumps(body.get("messages", body.get("input", "")))
+        completion = body.get("max_completion_tokens") or body.get("max_tokens") or self.completion_tokens
+        return model, len(prompt) // 4 + completion, bool(body.get("stream"))
+
+    @staticmethod
+    def _used_tokens(response: httpx.Response) -> Optional[int]:
+        try:
+            return int(response.json()["usage"]["total_tokens"])
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    @staticmethod
+    def _retry_reason(response: httpx.Response) -> Optional[str]:
+        if response.status_code not in RETRY_STATUSES:
+            return None
+        if response.status_code == 429:
+            try:
+                # Out of credit rather than over the rate: waiting will not help.
+                if response.json()["error"]["code"] == "insufficient_quota":
+                    return None
+            except (ValueError, KeyError, TypeError):
+                pass
+            return "429"
+        return "5xx"
+
+    def _delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Full-jitter exponential backoff, but never sooner than the server's `retry-after`."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if response is not None:
+            try:
+                if "retry-after-ms" in response.headers:
+                    return max(delay, min(self.max_delay, float(response.headers["retry-after-ms"]) / 1000))
+                if "retry-after" in response.headers:
+                    return max(delay, min(self.max_delay, float(response.headers["retry-after"])))
+            except ValueError:
+                pass
+        return delay
+
+    def _log_retry(self, model: str, reason: str, attempt: int, delay: float):
+        RATE_LIMIT_RETRIES.labels(model, reason).inc()
+        logger.warning(f"OpenAI request for {model} failed ({reason}), retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+
+
+class GovernedTransport(_GovernedRequests, httpx.BaseTransport):
+    """httpx transport that sends OpenAI requests through a `RateLimitGovernor` and retries 429s, 5xx and dropped connections.
+
+    Inside a `caller_backoff` block a 429 is returned instead of retried.
+    """
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        model, tokens, streaming = self._describe(request)
+        for attempt in range(self.max_retries + 1):
+            taken = self.governor.acquire_sync(model, tokens)
+            try:
+                response = self.transport.handle_request(request)
+            except (httpx.TimeoutException, httpx.NetworkError):
+                self.governor.settle(model, taken, 0)
+                if attempt == self.max_retries:
+                    raise
+                delay = self._delay(attempt)
+                self._log_retry(model, "connection", attempt, delay)
+                time.sleep(delay)
+                continue
+            if not streaming or response.status_code in RETRY_STATUSES:
+                response.read()
+            reason = self._retry_reason(response)
+            delay = self._delay(attempt, response) if reason else 0.0
+            if reason == "429":
+                self.governor.pause(model, delay)
+            if reason is None or attempt == self.max_retries or (reason == "429" and _caller_backoff.get()):
+                if streaming:
+                    response.stream = _SyncStreamedUsage(response.stream, self.governor, model, taken)
+                else:
+                    used = self._used_tokens(response)
+                    if used is not None:
+                        self.governor.settle(model, taken, used)
+                return response
+            response.close()
+            self._log_retry(model, reason, attempt, delay)
+            time.sleep(delay)
+
+    def close(self):
+        self.transport.close()
+
+
+class AsyncGovernedTransport(_GovernedRequests, httpx.AsyncBaseTransport):
+    """Async variant of `GovernedTransport`."""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        model, tokens, streaming = self._describe(request)
+        for attempt in range(self.max_retries + 1):
+            taken = await self.governor.acquire(model, tokens)
+            try:
+                response = await self.transport.handle_async_request(request)
+            except (httpx.TimeoutException, httpx.NetworkError):
+                self.governor.settle(model, taken, 0)
+                if attempt == self.max_retries:
+                    raise
+                delay = self._delay(attempt)
+                self._log_retry(model, "connection", attempt, delay)
+                await asyncio.sleep(delay)
+                continue
+            if not streaming or response.status_code in RETRY_STATUSES:
+                await response.aread()
+            reason = self._retry_reason(response)
+            delay = self._delay(attempt, response) if reason else 0.0
+            if reason == "429":
+                self.governor.pause(model, delay)
+            if reason is None or attempt == self.max_retries or (reason == "429" and _caller_backoff.get()):
+                if streaming:
+                    response.stream = _AsyncStreamedUsage(response.stream, self.governor, model, taken)
+                else:
+                    used = self._used_tokens(response)
+                    if used is not None:
+                        self.governor.settle(model, taken, used)
+                return response
+            await response.aclose()
+            self._log_retry(model, reason, attempt, delay)
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        await self.transport.aclose()
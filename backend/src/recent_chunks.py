@@ -0,0 +1,109 @@
+import os
+import time
+import json
+import threading
+from typing import Dict, List
+
+import numpy as np
+
+
+class RecentChunkBuffer:
+    """Per-thread write-through buffer of freshly ingested chunks and their vectors.
+
+    Azure AI Search indexes uploads asynchronously, so a search issued right
+    after `upload_documents` can come back empty. Ingestion writes every
+    uploaded chunk here as well, and retrieval searches the buffer locally so
+    the first turn after an upload can read its own writes. Entries expire
+    after `ttl_seconds`, by which time the remote index has caught up.
+    """
+
+    def __init__(self, ttl_seconds: float | None = None, max_chunks_per_thread: int = 2000):
+        self.ttl_seconds = ttl_seconds or float(os.getenv("RECENT_CHUNK_TTL_SECONDS", "600"))
+        self.max_chunks_per_thread = max_chunks_per_thread
+        self._threads: Dict[str, List[dict]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, thread_id: str, documents: List[dict]):
+        """Adds uploaded index documents (id, content, content_vector, metadata) for a thread."""
+        now = time.time()
+        with self._lock:
+            uploaded_ids = {document["id"] for document in documents}
+            entries = [entry for entry in self._threads.get(thread_id, []) if entry["id"] not in uploaded_ids]
+            self._threads[thread_id] = entries
+            for document in documents:
+                entries.append({
+                    "id": document["id"],
+                    "content": document["content"],
+                    "vector": np.asarray(document["content_vector"], dtype=np.float32),
+                    "metadata": document["metadata"],
+                    "added_at": now,
+                })
+            del entries[:-self.max_chunks_per_thread]
+
+    def update_metadata(self, thread_id: str, metadata: Dict[str, dict]):
+        """Replaces the metadata of buffered chunks of a thread, by id."""
+        with self._lock:
+            for entry in self._threads.get(thread_id, []):
+                if entry["id"] in metadata:
+                    entry["metadata"] = json.dumps(metadata[entry["id"]])
+
+    def remove(self, thread_id: str, ids: List[str]):
+        ids = set(ids)
+        with self._lock:
+            if thread_id in self._threads:
+                self._threads[thread_id] = [entry for entry in self._threads[thread_id] if entry["id"] not in ids]
+
+    def drop(self, thread_id: str):
+        """Forgets every buffered chunk of a thread."""
+        with self._lock:
+            self._threads.pop(thread_id, None)
+
+    def list_documents(self, thread_id: str) -> List[dict]:
+        """Returns the `id` and decoded `metadata` of the live buffered chunks of a thread."""
+        return [{"id": entry["id"], "metadata": json.loads(entry["metadata"])} for entry in self._live_entries(thread_id)]
+
+    def _live_entries(self, thread_id: str) -> List[dict]:
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            entries = [entry for entry in self._threads.get(thread_id, []) if entry["added_at"] >= cutoff]
+            if entries:
+                self._threads[thread_id] = entries
+            else:
+                self._threads.pop(thread_id, None)
+            return entries
+
+    def search_many(self, thread_id: str, query_vectors: np.ndarray, k: int = 5) -> List[List[dict]]:
+        """
+        Returns the `k` buffered chunks most similar to each query vector. The
+        buffer is stacked into one matrix and scored against every query at once.
+
+        Args:
+            thread_id: The thread to search in
+            query_vectors: The embedded queries, one per row
+            k: Maximum number of results per query
+
+        Returns:
+            List[List[dict]]: Per query, results shaped like retrieved context, with `id` and cosine `score`
+        """
+        entries = self._live_entries(thread_id)
+        if not entries:
+            return [[] for _ in query_vectors]
+
+        matrix = np.stack([entry["vector"] for entry in entries])
+        queries = np.asarray(query_vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1)[:, None] * np.linalg.norm(queries, axis=1)[None, :]
+        scores = matrix @ queries.T / np.where(norms == 0, 1, norms)
+
+        rankings = []
+        for column in scores.T:
+            top = np.argsort(-column)[:k]
+            rankings.append([
+                {
+                    "id": entries[i]["id"],
+                    "page_content": entries[i]["content"],
+                    "metadata": json.loads(entries[i]["metadata"]),
+                    "score": float(column[i]),
+                }
+                for i in top
+            ])
+        return rankings
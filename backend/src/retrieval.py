@@ -0,0 +1,144 @@
+import os
+import asyncio
+import logging
+import threading
+from itertools import zip_longest
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from backend.src.prompts import PromptFactory
+from backend.src.recent_chunks import RecentChunkBuffer
+from backend.src.vector_stores.base import VectorStore
+
+logger = logging.getLogger(__name__)
+
+RRF_K = 60
+
+
+def _unit(vector) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class MultiQueryRetriever:
+    """Retrieves context with one focused sub-query per section of the letter.
+
+    Each section of `RETRIEVAL_QUERY_TEMPLATE` (credentials, relationship,
+    initiative, achievements, ...) is searched on its own, plus one search
+    for the user's request itself. Section vectors are embedded once and
+    reused; per turn only the request and recent history are embedded, and
+    each section query vector is the normalised sum of the section and
+    request vectors. Every sub-query runs against both the vector store and
+    the recent-chunk buffer concurrently; the two result lists of a sub-query
+    are merged into one ranking without duplicates, and the rankings are
+    fused with reciprocal rank fusion into at most `max_candidates` chunks,
+    which `ContextAssembler` then narrows down.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        vector_store: VectorStore,
+        recent_chunks: Optional[RecentChunkBuffer] = None,
+        sections: Optional[Dict[str, str]] = None,
+        per_query_k: int | None = None,
+        max_candidates: int | None = None,
+        request_weight: float | None = None,
+    ):
+        self.embeddings = embeddings
+        self.vector_store = vector_store
+        self.recent_chunks = recent_chunks
+        self.sections = sections or PromptFactory().get_prompt("retrieval_sections")
+        self.per_query_k = per_query_k or int(os.getenv("RETRIEVAL_PER_QUERY_K", "4"))
+        self.max_candidates = max_candidates or int(os.getenv("RETRIEVAL_CANDIDATES", "30"))
+        self.request_weight = request_weight if request_weight is not None else float(os.getenv("RETRIEVAL_REQUEST_WEIGHT", "0.5"))
+        self._section_vectors: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def _embed_sections(self) -> np.ndarray:
+        with self._lock:
+            if self._section_vectors is None:
+                vectors = self.embeddings.embed_documents(list(self.sections.values()))
+                self._section_vectors = np.stack([_unit(vector) for vector in vectors])
+            return self._section_vectors
+
+    async def warm_up(self):
+        """Embeds the section queries ahead of the first turn."""
+        await asyncio.to_thread(self._embed_sections)
+
+    def _queries(self, request: str, request_vector: np.ndarray, section_vectors: np.ndarray) -> List[tuple]:
+        queries = [("request", request, request_vector)]
+        for (name, text), vector in zip(self.sections.items(), section_vectors):
+            queries.append((name, f"{text} {request}", _unit(vector + self.request_weight * request_vector)))
+        return queries
+
+    @staticmethod
+    def _merge(indexed: List[dict], buffered: List[dict]) -> List[dict]:
+        """Interleaves the index and buffer results of one sub-query by rank, keeping each chunk once."""
+        merged, seen = [], set()
+        for pair in zip_longest(indexed, buffered):
+            for result in pair:
+                if result is not None and result["id"] not in seen:
+                    seen.add(result["id"])
+                    merged.append(result)
+        return merged
+
+    async def _search(self, thread_id: str, queries: List[tuple]) -> List[List[dict]]:
+        searches = [
+            self.vector_store.asearch(thread_id, text, vector.tolist(), k=self.per_query_k) for _, text, vector in queries
+        ]
+        if self.recent_chunks is None:
+            return list(await asyncio.gather(*searches))
+        # The buffer is scored against every sub-query in one pass, off the event loop.
+        buffered = asyncio.to_thread(
+            self.recent_chunks.search_many, thread_id, np.stack([vector for _, _, vector in queries]), self.per_query_k
+        )
+        *indexed, buffered = await asyncio.gather(*searches, buffered)
+        # A chunk found by both sources counts once per sub-query, as the
+        # buffer and the index hold copies of the same recent chunks.
+        return [self._merge(results, recent) for results, recent in zip(indexed, buffered)]
+
+    def _fuse(self, rankings: List[List[dict]]) -> List[dict]:
+        scores: Dict[str, float] = {}
+        results: Dict[str, dict] = {}
+        for ranking in rankings:
+            for rank, result in enumerate(ranking, 1):
+                scores[result["id"]] = scores.get(result["id"], 0.0) + 1.0 / (RRF_K + rank)
+                results.setdefault(result["id"], result)
+        top = sorted(scores, key=scores.get, reverse=True)[:self.max_candidates]
+        return [
+            {"page_content": results[i]["page_content"], "metadata": results[i]["metadata"], "score": scores[i]}
+            for i in top
+        ]
+
+    async def retrieve(self, thread_id: str, request: str, history: str = "", attempts: int = 3) -> List[dict]:
+        """
+        Searches a thread for the context of a letter.
+
+        Args:
+            thread_id: The thread partition to search
+            request: The user's request
+            history: The recent conversation, embedded with the request
+            attempts: Searches to try, with a growing delay, while nothing is found
+
+        Returns:
+            List[dict]: Up to `max_candidates` chunks with `page_content`, `metadata` and fused `score`, best first
+        """
+        section_vectors = self._section_vectors
+        if section_vectors is None:
+            section_vectors = await asyncio.to_thread(self._embed_sections)
+        request_vector = _unit(await self.embeddings.aembed_query(f"{request}\n{history}".strip()))
+        queries = self._queries(request, request_vector, section_vectors)
+
+        context = []
+        for i in range(attempts):
+            context = self._fuse(await self._search(thread_id, queries))
+            if context:
+                logger.info(f"Retrieved {len(context)} chunks from {len(queries)} sub-queries on attempt {i+1}.")
+                break
+            if i + 1 < attempts:
+                logger.warning(f"Attempt {i+1}: Context is empty, retrying in {1 + i * 2} second(s)...")
+                await asyncio.sleep(1 + i * 2)
+        return context
@@ -0,0 +1,135 @@
+import logging
+import os
+import asyncio
+import re
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from backend.src.schemas import GraphState
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_FIELDS = ["client_name", "client_pronouns", "client_endeavor", "lor_questionnaire"]
+
+SMALL_TALK_PATTERN = re.compile(
+    r"^(hi|hello|hey|hola|thanks|thank you|thank you so much|thx|ty|gracias|muchas gracias|ok|okay|k|"
+    r"great|cool|nice|perfect|awesome|got it|sounds good|bye|goodbye|good morning|good afternoon|"
+    r"good evening|buenos d[ií]as|buenas tardes|adi[oó]s)[\s!.,:)]*$",
+    re.IGNORECASE,
+)
+
+# Labeled examples for the embedding-similarity classifier. Only routes that
+# can be decided from the wording of the request alone are listed here.
+ROUTE_EXAMPLES = {
+    "context_completeness_check": [
+        "Please generate the letter of recommendation now.",
+        "Go ahead and draft the LOR.",
+        "I have provided everything, write the letter.",
+        "Can you create the recommendation letter?",
+        "Generate the document with the information you have.",
+        "Write the letter now please.",
+    ],
+    "retrieve_context": [
+        "I uploaded the questionnaire and the CV, please use them.",
+        "Use the documents I attached.",
+        "Check the files I just uploaded.",
+        "Here are the PDFs with the client's information.",
+        "Read the attached questionnaire.",
+    ],
+    "context_gatherer_agent": [
+        "What information do you need from me?",
+        "How does this process work?",
+        "The client's name is Maria Lopez and her pronouns are she/her.",
+        "Her proposed endeavor is a clean energy startup in Texas.",
+        "Can you explain what a letter of recommendation for an NIW needs?",
+        "I want to start a new letter.",
+    ],
+}
+
+
+class FastPathRouter:
+    """Decides the clear-cut routes locally before falling back to the LLM router.
+
+    Rules run first: newly uploaded files go to `retrieve_context`, plain small
+    talk goes to `context_gatherer_agent`, and a state that already holds all
+    four required fields goes to `context_completeness_check`. Otherwise the
+    request is compared against labeled examples by embedding similarity and
+    the nearest route is accepted only when it is both similar enough and
+    clearly ahead of the runner-up.
+    """
+
+    def __init__(self, embeddings=None, threshold: float | None = None, margin: float | None = None):
+        self.embeddings = embeddings
+        if os.getenv("ROUTER_EMBEDDING_CLASSIFIER", "true").lower() not in ("1", "true", "yes"):
+            self.embeddings = None
+        self.threshold = threshold or float(os.getenv("ROUTER_CLASSIFIER_THRESHOLD", "0.6"))
+        self.margin = margin or float(os.getenv("ROUTER_CLASSIFIER_MARGIN", "0.05"))
+        self._example_routes: List[str] = []
+        self._example_vectors: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_files(state: GraphState) -> List[str]:
+        routed = set(state.get("routed_files") or [])
+        return [file for file in state.get("files") or [] if file not in routed]
+
+    def _examples(self) -> np.ndarray:
+        with self._lock:
+            if self._example_vectors is None:
+                texts = []
+                for route, examples in ROUTE_EXAMPLES.items():
+                    self._example_routes.extend([route] * len(examples))
+                    texts.extend(examples)
+                vectors = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+                self._example_vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+            return self._example_vectors
+
+    def _rank(self, examples: np.ndarray, query_vector: List[float]) -> Tuple[Optional[str], float]:
+        query = np.asarray(query_vector, dtype=np.float32)
+        similarities = examples @ (query / (np.linalg.norm(query) or 1.0))
+
+        best = {}
+        for route, similarity in zip(self._example_routes, similarities):
+            best[route] = max(best.get(route, -1.0), float(similarity))
+        ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)
+        (route, score), runner_up = ranked[0], ranked[1][1] if len(ranked) > 1 else -1.0
+        if score >= self.threshold and score - runner_up >= self.margin:
+            return route, score
+        return None, score
+
+    async def aclassify(self, request: str) -> Tuple[Optional[str], float]:
+        """
+        Returns the nearest route for the request and its similarity, or
+        (None, score) when the classifier is not confident.
+        """
+        examples = await asyncio.to_thread(self._examples)
+        return self._rank(examples, await self.embeddings.aembed_query(request))
+
+    async def aroute(self, state: GraphState) -> Optional[Tuple[str, str]]:
+        """
+        Tries to route the turn without an LLM call.
+
+        Returns:
+            Optional[Tuple[str, str]]: (route, deciding path), or None to defer to the LLM
+        """
+        if self.new_files(state):
+            return "retrieve_context", "rules:new_files"
+
+        request = (state.get("request") or "").strip()
+        if SMALL_TALK_PATTERN.match(request):
+            return "context_gatherer_agent", "rules:small_talk"
+
+        if all(state.get(field) for field in REQUIRED_FIELDS):
+            return "context_completeness_check", "rules:fields_complete"
+
+        if self.embeddings is None or not request:
+            return None
+        route, score = await self.aclassify(request)
+        logger.info(f"Router classifier score: {score:.3f} -> {route or 'low confidence'}")
+        if route == "retrieve_context" and not state.get("files"):
+            return None
+        if route:
+            return route, "classifier"
+        return None
@@ -17,6 +17,12 @@ class GraphState(TypedDict):
         pronouns: Optional pronouns for the client.
         thread_id: The unique identifier for the conversation thread.
         conversation_history: A list of messages in the conversation.
+        history_summary: Running summary of the messages before `summarized_upto`.
+        summarized_upto: How many leading messages of the history the summary covers.
+        route: The node the master router chose for the current turn.
+        route_source: What decided the route: a fast-path rule, the classifier or the LLM.
+        routed_files: The uploaded files the router has already seen.
+        context_tokens_saved: Context tokens the last retrieval saved by merging overlapping chunks.
     """
     request: str
     thread_id: str
@@ -29,7 +35,13 @@ class GraphState(TypedDict):
     follow_up_question: str = ""
     generated_document: str
     conversation_history: List[str]
+    history_summary: str
+    summarized_upto: int
     conversational_response: str
+    route: str
+    route_source: str
+    routed_files: List[str]
+    context_tokens_saved: int
     # Store important information separately 
     client_name: Optional[str] = None
     client_pronouns: Optional[str] = None
@@ -40,4 +52,14 @@ class GenerationResponse(BaseModel):
     thread_id: str
     response: str
     status: str
-    document: Optional[str] = None 
\ No newline at end of file
+    document: Optional[str] = None
+    ingestion_job_id: Optional[str] = None
+
+class IngestionJobStatus(BaseModel):
+    job_id: str
+    thread_id: str
+    status: str
+    files: List[str]
+    progress: List[str]
+    result: Optional[dict] = None
+    error: Optional[str] = None
@@ -0,0 +1,65 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+
+class SessionStore:
+    """Bounded LRU of active conversation threads with idle expiry.
+
+    Holds only the thread id and when it was last used; conversation state
+    itself lives in the graph checkpointer. Threads idle for longer than
+    `ttl_seconds`, or the least recently used ones once more than
+    `max_sessions` are active, are dropped and passed to `on_evict` so
+    per-thread resources held in memory can be released.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int | None = None,
+        ttl_seconds: float | None = None,
+        on_evict: Optional[Callable[[str], None]] = None,
+    ):
+        self.max_sessions = max_sessions or int(os.getenv("MAX_SESSIONS", "1000"))
+        self.ttl_seconds = ttl_seconds or float(os.getenv("SESSION_TTL_SECONDS", "86400"))
+        self.on_evict = on_evict
+        self._sessions: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def touch(self, thread_id: str):
+        """Marks a thread as used now, evicting idle and overflowing threads."""
+        with self._lock:
+            self._sessions[thread_id] = time.time()
+            self._sessions.move_to_end(thread_id)
+            evicted = self._expire()
+            while len(self._sessions) > self.max_sessions:
+                evicted.append(self._sessions.popitem(last=False)[0])
+        self._release(evicted)
+
+    def __contains__(self, thread_id: str) -> bool:
+        with self._lock:
+            evicted = self._expire()
+            found = thread_id in self._sessions
+        self._release(evicted)
+        return found
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _expire(self) -> list:
+        cutoff = time.time() - self.ttl_seconds
+        evicted = []
+        # Entries are kept in last-used order, so the idle ones are at the front.
+        while self._sessions:
+            thread_id, last_used = next(iter(self._sessions.items()))
+            if last_used >= cutoff:
+                break
+            self._sessions.popitem(last=False)
+            evicted.append(thread_id)
+        return evicted
+
+    def _release(self, thread_ids: list):
+        if self.on_evict:
+            for thread_id in thread_ids:
+                self.on_evict(thread_id)
@@ -0,0 +1,89 @@
+"""One-time startup of the shared graph, search index and retriever.
+
+The entry points import this module instead of `backend.src.graph`. Importing
+the graph loads LangGraph, the OpenAI and Azure Search SDKs and the PDF
+tooling, which takes longer than the rest of the server put together. With
+this module the server accepts connections first. `start()` then builds the
+graph in a worker thread, provisions the search index and embeds the
+retrieval section queries as one background task. Handlers await `ready()`
+for the result. A failed startup is raised to the callers waiting on it, and
+the next call retries.
+"""
+import time
+import asyncio
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_task: Optional[asyncio.Task] = None
+_graph: Optional[tuple] = None
+_error: Optional[str] = None
+_seconds: Optional[float] = None
+
+
+def _build():
+    # Deferred so importing an entry point does not load the model and search SDKs.
+    from backend.src.graph import get_graph
+
+    app_instance, agent = get_graph()
+    agent.vector_store.provision()
+    return app_instance, agent
+
+
+async def _prepare() -> tuple:
+    global _graph, _error, _seconds
+    started = time.perf_counter()
+    try:
+        app_instance, agent = await asyncio.to_thread(_build)
+        await agent.retriever.warm_up()
+    except Exception as e:
+        _error = str(e)
+        logger.exception("Startup failed")
+        raise
+    _graph, _error = (app_instance, agent), None
+    _seconds = time.perf_counter() - started
+    logger.info(f"Graph, search index and retriever ready after {_seconds:.2f}s")
+    return _graph
+
+
+def start() -> asyncio.Task:
+    """Schedules startup on the running loop unless it is running or has succeeded."""
+    global _task
+    if _task is None or (_task.done() and (_task.cancelled() or _task.exception() is not None)):
+        _task = asyncio.get_running_loop().create_task(_prepare())
+    return _task
+
+
+async def ready() -> tuple:
+    """
+    Waits for startup, starting it if needed.
+
+    Returns:
+        tuple: The compiled graph and its document agent
+    """
+    if _graph is not None:
+        return _graph
+    # Shielded so a client that disconnects does not cancel startup for everyone else.
+    return await asyncio.shield(start())
+
+
+def loaded() -> Optional[tuple]:
+    """Returns the graph and agent if startup has finished, without waiting."""
+    return _graph
+
+
+async def shutdown():
+    """Cancels a startup still in progress and closes the clients of a finished one."""
+    global _task, _graph
+    if _task is not None and not _task.done():
+        _task.cancel()
+    _task = None
+    if _graph is not None:
+        _, agent = _graph
+        _graph = None
+        await agent.vector_store.aclose()
+
+
+def status() -> dict:
+    return {"ready": _graph is not None, "startup_seconds": _seconds, "error": _error}
@@ -0,0 +1,14 @@
+from typing import Callable
+
+TokenCounter = Callable[[str], int]
+
+
+def tiktoken_counter(encoding_name: str = "cl100k_base") -> TokenCounter:
+    """
+    Counts tokens with a tiktoken encoding. The encoding file is downloaded on
+    first use unless it is already in `TIKTOKEN_CACHE_DIR`.
+    """
+    import tiktoken
+
+    encoding = tiktoken.get_encoding(encoding_name)
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
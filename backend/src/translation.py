@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import os
+import json
+import hashlib
+from typing import List, Optional
+
+from backend.src.cache import CACHE_DIR, SQLiteLRUCache
+from backend.src.language import is_probably_english
+from backend.src.prompts import PromptFactory
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkTranslator:
+    """Translates chunks into English with a persistent cache in front of the LLM.
+
+    Translations are keyed on a hash of the chunk text and the target
+    language, so a chunk translated at ingestion time is a local lookup for
+    every later turn. Chunks detected as English are returned unchanged and
+    never sent to the model.
+    """
+
+    def __init__(self, llm, cache: Optional[SQLiteLRUCache] = None, max_concurrency: int | None = None, target_language: str = "en"):
+        self.llm = llm
+        self.target_language = target_language
+        self.max_concurrency = max_concurrency or int(os.getenv("TRANSLATION_MAX_CONCURRENCY", "5"))
+        self.cache = cache or SQLiteLRUCache(
+            path=os.getenv("TRANSLATION_CACHE_PATH", os.path.join(CACHE_DIR, "translations.sqlite")),
+            table="translations",
+            max_entries=int(os.getenv("TRANSLATION_CACHE_MAX_ENTRIES", "50000")),
+        )
+        self.prompt_factory = PromptFactory()
+
+    def _key(self, text: str) -> str:
+        chunk_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{chunk_hash}:{self.target_language}"
+
+    @staticmethod
+    def _parse_translation(content: str) -> str:
+        try:
+            parsed = json.loads(content)
+            if isinstance(parsed, dict) and "translated_text" in parsed:
+                return parsed["translated_text"]
+            return content
+        except json.JSONDecodeError:
+            logger.warning("JSON parsing failed, using raw response")
+            return content
+
+    def lookup(self, texts: List[str]) -> List[Optional[str]]:
+        """
+        Resolves translations without calling the model.
+
+        Returns:
+            List[Optional[str]]: The English text per chunk, or None where it is not cached
+        """
+        results: List[Optional[str]] = [text if is_probably_english(text) else None for text in texts]
+        pending = [i for i, result in enumerate(results) if result is None]
+        cached = self.cache.get_many([self._key(texts[i]) for i in pending])
+        for i in pending:
+            value = cached.get(self._key(texts[i]))
+            if value is not None:
+                results[i] = value.decode("utf-8")
+        return results
+
+    def _store(self, texts: List[str], pending: List[int], responses, results: List[Optional[str]]):
+        for i, response in zip(pending, responses):
+            results[i] = self._parse_translation(response.content)
+        self.cache.set_many({self._key(texts[i]): results[i].encode("utf-8") for i in pending})
+        return results
+
+    async def atranslate(self, texts: List[str]) -> List[str]:
+        """Translates chunks into English, calling the model only for cache misses."""
+        results = await asyncio.to_thread(self.lookup, texts)
+        pending = [i for i, result in enumerate(results) if result is None]
+        logger.info(f"Translating {len(pending)} of {len(texts)} chunks (the rest are English or cached)")
+        if pending:
+            prompts = [self.prompt_factory.get_prompt("translation", texts[i]) for i in pending]
+            responses = await self.llm.abatch(prompts, config={"max_concurrency": self.max_concurrency})
+            await asyncio.to_thread(self._store, texts, pending, responses, results)
+        return results
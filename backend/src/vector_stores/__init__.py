@@ -0,0 +1,19 @@
+import os
+
+from .base import VectorStore
+
+
+def create_vector_store() -> VectorStore:
+    """
+    Creates the vector store selected by the VECTOR_STORE_BACKEND environment
+    variable: "azure" (default) for Azure AI Search or "local" for the
+    in-process NumPy index.
+    """
+    backend = os.getenv("VECTOR_STORE_BACKEND", "azure").lower()
+    if backend == "azure":
+        from .azure import AzureSearchVectorStore
+        return AzureSearchVectorStore()
+    if backend == "local":
+        from .local import LocalVectorStore
+        return LocalVectorStore()
+    raise ValueError(f"Unknown VECTOR_STORE_BACKEND '{backend}'. Expected 'azure' or 'local'.")
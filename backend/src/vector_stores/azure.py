@@ -0,0 +1,224 @@
+import logging
+import os
+import json
+import asyncio
+import hashlib
+from typing import Dict, List
+
+from azure.core.credentials import AzureKeyCredential
+from azure.search.documents import SearchClient
+from azure.search.documents.aio import SearchClient as AsyncSearchClient
+from azure.search.documents.indexes import SearchIndexClient
+from azure.search.documents.indexes.models import (
+    SearchableField,
+    SearchField,
+    SearchFieldDataType,
+    SimpleField,
+    SearchIndex,
+    VectorSearch,
+    VectorSearchProfile,
+    HnswAlgorithmConfiguration,
+)
+from azure.search.documents.models import VectorizedQuery
+
+from backend.src.cache import CACHE_DIR
+
+from .base import VectorStore
+
+logger = logging.getLogger(__name__)
+
+# Provision keys already checked by this process.
+_provisioned = set()
+
+
+class AzureSearchVectorStore(VectorStore):
+    """Vector store backed by an Azure AI Search index, filtered by `thread_id`.
+
+    The index is created by `provision`, which the server runs once at
+    startup, not on construction. Graph nodes search through the async
+    client, which holds an aiohttp session bound to the event loop it was
+    first used on; a client is opened per running loop, and the one it
+    replaces is closed. `aclose` closes the remaining clients at shutdown.
+    """
+
+    def __init__(self):
+        self.index_name = os.getenv("AZURE_SEARCH_INDEX")
+        endpoint = os.getenv("AZURE_SEARCH_ENDPOINT")
+        credential = AzureKeyCredential(os.getenv("AZURE_SEARCH_KEY"))
+
+        fields = [
+            SimpleField(
+                name="id",
+                type=SearchFieldDataType.String,
+                key=True,
+                filterable=True,
+                retrievable=True,
+            ),
+            SearchableField(
+                name="content",
+                type=SearchFieldDataType.String,
+                searchable=True,
+                retrievable=True,
+            ),
+            SearchableField(
+                name="metadata",
+                type=SearchFieldDataType.String,
+                searchable=True,
+                retrievable=True,
+            ),
+            SearchField(
+                name="content_vector",
+                type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
+                searchable=True,
+                vector_search_dimensions=3072,
+                vector_search_profile_name="my-vector-search-profile",
+            ),
+            SimpleField(
+                name="thread_id",
+                type=SearchFieldDataType.String,
+                filterable=True,
+                searchable=True,
+            ),
+        ]
+
+        vector_search = VectorSearch(
+            profiles=[VectorSearchProfile(name="my-vector-search-profile", algorithm_configuration_name="my-algorithms-config")],
+            algorithms=[HnswAlgorithmConfiguration(name="my-algorithms-config")],
+        )
+
+        index = SearchIndex(name=self.index_name, fields=fields, vector_search=vector_search)
+
+        self._endpoint = endpoint
+        self._credential = credential
+        self._async_client = None
+        self._async_loop = None
+        self._closing = set()
+
+        self._index = index
+
+        self.client = SearchClient(endpoint=endpoint, index_name=self.index_name, credential=credential)
+
+    def _provision_key(self) -> str:
+        schema = json.dumps(self._index.as_dict(), sort_keys=True)
+        return hashlib.sha256(f"{self._endpoint}\n{schema}".encode("utf-8")).hexdigest()
+
+    def provision(self):
+        """
+        Creates the index unless it exists. Once an index with this schema is
+        known to exist on this endpoint, the key is recorded in
+        `SEARCH_INDEX_MARKER_PATH`, so later starts skip the round trip to the
+        service.
+        """
+        key = self._provision_key()
+        if key in _provisioned:
+            return
+        marker_path = os.getenv("SEARCH_INDEX_MARKER_PATH", os.path.join(CACHE_DIR, "search_indexes.json"))
+        try:
+            with open(marker_path, encoding="utf-8") as f:
+                known = set(json.load(f))
+        except (OSError, ValueError):
+            known = set()
+
+        if key in known:
+            logger.info(f"Index '{self.index_name}' was provisioned by an earlier start.")
+        else:
+            index_client = SearchIndexClient(endpoint=self._endpoint, credential=self._credential)
+            if self.index_name not in index_client.list_index_names():
+                index_client.create_index(self._index)
+                logger.info(f"Index '{self.index_name}' created.")
+            else:
+                logger.info(f"Index '{self.index_name}' already exists.")
+            known.add(key)
+            try:
+                os.makedirs(os.path.dirname(marker_path) or ".", exist_ok=True)
+                with open(marker_path, "w", encoding="utf-8") as f:
+                    json.dump(sorted(known), f)
+            except OSError as e:
+                logger.warning(f"Could not record provisioned index in {marker_path}: {e}")
+        _provisioned.add(key)
+
+    def upload_documents(self, documents: List[dict]):
+        self.client.upload_documents(documents=documents)
+
+    def delete_documents(self, thread_id: str, ids: List[str]):
+        if ids:
+            self.client.delete_documents(documents=[{"id": document_id} for document_id in ids])
+
+    def update_metadata(self, thread_id: str, metadata: Dict[str, dict]):
+        if metadata:
+            self.client.merge_documents(
+                documents=[{"id": document_id, "metadata": json.dumps(value)} for document_id, value in metadata.items()]
+            )
+
+    def list_documents(self, thread_id: str) -> List[dict]:
+        results = self.client.search(
+            search_text="*",
+            filter=f"thread_id eq '{thread_id}'",
+            select=["id", "metadata"],
+        )
+        return [{"id": result["id"], "metadata": json.loads(result.get("metadata", "{}"))} for result in results]
+
+    def _search_args(self, thread_id: str, text: str, vector: List[float], k: int) -> dict:
+        return {
+            "search_text": text,
+            "vector_queries": [VectorizedQuery(vector=vector, k_nearest_neighbors=k, fields="content_vector")],
+            "filter": f"thread_id eq '{thread_id}'",
+            "select": ["id", "content", "metadata"],
+            "top": k,
+        }
+
+    @staticmethod
+    def _result(result) -> dict:
+        return {
+            "id": result["id"],
+            "page_content": result["content"],
+            "metadata": json.loads(result.get("metadata", "{}")),
+        }
+
+    def search(self, thread_id: str, text: str, vector: List[float], k: int = 5) -> List[dict]:
+        results = self.client.search(**self._search_args(thread_id, text, vector, k))
+        return [self._result(result) for result in results]
+
+    @staticmethod
+    async def _close_quietly(client: AsyncSearchClient):
+        try:
+            await client.close()
+        except Exception as e:
+            logger.debug(f"Closing a search client of a finished event loop failed: {e}")
+
+    def _close_replaced_client(self):
+        client, loop = self._async_client, self._async_loop
+        self._async_client = self._async_loop = None
+        # The client's connections belong to the loop that opened them, so it is
+        # closed there while that loop still runs, and otherwise on this one.
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._close_quietly(client), loop)
+        else:
+            task = asyncio.get_running_loop().create_task(self._close_quietly(client))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    def _client_for_loop(self) -> AsyncSearchClient:
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            if self._async_client is not None:
+                self._close_replaced_client()
+            self._async_client = AsyncSearchClient(
+                endpoint=self._endpoint, index_name=self.index_name, credential=self._credential
+            )
+            self._async_loop = loop
+        return self._async_client
+
+    async def asearch(self, thread_id: str, text: str, vector: List[float], k: int = 5) -> List[dict]:
+        results = await self._client_for_loop().search(**self._search_args(thread_id, text, vector, k))
+        return [self._result(result) async for result in results]
+
+    async def aclose(self):
+        if self._async_client is not None:
+            if self._async_loop is asyncio.get_running_loop():
+                await self._async_client.close()
+                self._async_client = self._async_loop = None
+            else:
+                self._close_replaced_client()
+        await asyncio.gather(*self._closing)
+        self.client.close()
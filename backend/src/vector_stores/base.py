@@ -0,0 +1,58 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Dict, List
+
+
+class VectorStore(ABC):
+    """Storage and hybrid retrieval of embedded chunks, partitioned by thread.
+
+    Documents use the Azure AI Search index shape: `id`, `content`,
+    `content_vector`, `thread_id` and `metadata` (a JSON string).
+    """
+
+    @abstractmethod
+    def upload_documents(self, documents: List[dict]):
+        """Inserts or replaces the given documents."""
+
+    @abstractmethod
+    def delete_documents(self, thread_id: str, ids: List[str]):
+        """Deletes the documents of a thread with the given ids."""
+
+    @abstractmethod
+    def update_metadata(self, thread_id: str, metadata: Dict[str, dict]):
+        """Replaces the metadata of stored documents of a thread, by id, keeping their content and vectors."""
+
+    @abstractmethod
+    def list_documents(self, thread_id: str) -> List[dict]:
+        """Returns the `id` and decoded `metadata` of every document stored for a thread."""
+
+    def provision(self):
+        """Creates the backing index if it does not exist. Runs once, at startup, before the first request."""
+
+    def release(self, thread_id: str):
+        """Frees in-process resources held for a thread. Stored documents are kept."""
+
+    async def aclose(self):
+        """Closes the clients held by the store. Runs once, at shutdown."""
+
+    @abstractmethod
+    def search(self, thread_id: str, text: str, vector: List[float], k: int = 5) -> List[dict]:
+        """
+        Runs a hybrid keyword plus vector search within one thread.
+
+        Args:
+            thread_id: The thread partition to search
+            text: The keyword query
+            vector: The embedded query
+            k: Number of results to return
+
+        Returns:
+            List[dict]: Results with `id`, `page_content` and decoded `metadata`
+        """
+
+    async def asearch(self, thread_id: str, text: str, vector: List[float], k: int = 5) -> List[dict]:
+        """
+        Async variant of `search`. Runs the blocking search in a worker thread
+        unless the backend has a native async client.
+        """
+        return await asyncio.to_thread(self.search, thread_id, text, vector, k)
@@ -0,0 +1,252 @@
+import os
+import re
+import json
+import math
+import hashlib
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from backend.src.cache import CACHE_DIR
+from .base import VectorStore
+
+RRF_K = 60
+KEYWORD_CANDIDATES = 50
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class _Partition:
+    """The documents of one thread: a matrix of unit vectors plus BM25 term statistics, updated in place."""
+
+    def __init__(self, documents: Iterable[dict] = (), vectors: Optional[np.ndarray] = None):
+        self.documents: List[dict] = []
+        self.index: Dict[str, int] = {}
+        self.term_freqs: List[Counter] = []
+        self.doc_freqs: Counter = Counter()
+        self.doc_lengths: List[int] = []
+        self.vectors = vectors if vectors is not None else np.zeros((0, 0), dtype=np.float32)
+        self._buffer = self.vectors
+        for document in documents:
+            self.put(document)
+
+    def put(self, document: dict) -> int:
+        """Adds a document, or replaces the one with the same id, and returns its row."""
+        freqs = Counter(_tokenize(f"{document['content']} {document['metadata']}"))
+        position = self.index.get(document["id"])
+        if position is None:
+            position = self.index[document["id"]] = len(self.documents)
+            self.documents.append(document)
+            self.term_freqs.append(freqs)
+            self.doc_lengths.append(sum(freqs.values()))
+        else:
+            self.doc_freqs.subtract(self.term_freqs[position].keys())
+            self.documents[position] = document
+            self.term_freqs[position] = freqs
+            self.doc_lengths[position] = sum(freqs.values())
+        self.doc_freqs.update(freqs.keys())
+        return position
+
+    def write_rows(self, rows: List[Tuple[int, np.ndarray]]):
+        """Stores vectors by row in memory, growing the matrix by doubling."""
+        count, dimensions = len(self.documents), len(rows[0][1])
+        if self._buffer.shape[0] < count or self._buffer.shape[1] != dimensions:
+            buffer = np.zeros((max(count, 2 * self._buffer.shape[0]), dimensions), dtype=np.float32)
+            if self._buffer.shape[1] == dimensions:
+                buffer[:len(self.vectors)] = self.vectors
+            self._buffer = buffer
+        for position, vector in rows:
+            self._buffer[position] = vector
+        self.vectors = self._buffer[:count]
+
+    def keyword_scores(self, text: str, k1: float = 1.2, b: float = 0.75) -> np.ndarray:
+        scores = np.zeros(len(self.documents), dtype=np.float32)
+        if not self.documents:
+            return scores
+        doc_lengths = np.asarray(self.doc_lengths, dtype=np.float32)
+        average_length = float(doc_lengths.mean()) or 1.0
+        count = len(self.documents)
+        for term in set(_tokenize(text)):
+            df = self.doc_freqs.get(term)
+            if not df:
+                continue
+            idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+            tf = np.array([freqs.get(term, 0) for freqs in self.term_freqs], dtype=np.float32)
+            scores += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * doc_lengths / average_length))
+        return scores
+
+
+class LocalVectorStore(VectorStore):
+    """In-process vector store with one flat NumPy index per thread.
+
+    Each thread partition is persisted under `path` as a raw float32 matrix
+    of unit-normalised vectors, opened memory-mapped, next to a JSON lines
+    log of the chunk text and metadata. Uploads write their vector rows in
+    place and append their records to the log, where a later record replaces
+    an earlier one with the same id, so ingesting in batches costs I/O in
+    proportion to each batch rather than to the partition. BM25 statistics
+    are updated the same way. Deletes rewrite the partition compacted.
+    Search fuses BM25 keyword ranking and cosine similarity ranking with
+    reciprocal rank fusion, the same way Azure AI Search scores a
+    `search_text` plus `VectorizedQuery` request. With `persist=False`
+    everything is kept in memory.
+    """
+
+    def __init__(self, path: Optional[str] = None, persist: bool = True):
+        self.path = (path or os.getenv("LOCAL_VECTOR_STORE_PATH", os.path.join(CACHE_DIR, "vector_store"))) if persist else None
+        self._partitions: Dict[str, _Partition] = {}
+        self._lock = threading.Lock()
+
+    def _partition_dir(self, thread_id: str) -> str:
+        return os.path.join(self.path, hashlib.sha256(thread_id.encode("utf-8")).hexdigest()[:32])
+
+    @staticmethod
+    def _map_vectors(directory: str, rows: int) -> np.ndarray:
+        with open(os.path.join(directory, "vectors.json"), encoding="utf-8") as f:
+            dimensions = json.load(f)["dimensions"]
+        if not rows:
+            return np.zeros((0, dimensions), dtype=np.float32)
+        return np.memmap(os.path.join(directory, "vectors.f32"), dtype=np.float32, mode="r", shape=(rows, dimensions))
+
+    def _load(self, thread_id: str) -> _Partition:
+        partition = self._partitions.get(thread_id)
+        if partition is not None:
+            return partition
+
+        partition = _Partition()
+        if self.path:
+            directory = self._partition_dir(thread_id)
+            if os.path.exists(os.path.join(directory, "vectors.json")):
+                with open(os.path.join(directory, "documents.jsonl"), encoding="utf-8") as f:
+                    for line in f:
+                        partition.put(json.loads(line))
+                partition.vectors = self._map_vectors(directory, len(partition.documents))
+
+        self._partitions[thread_id] = partition
+        return partition
+
+    def _rewrite(self, thread_id: str, partition: _Partition):
+        directory = self._partition_dir(thread_id)
+        os.makedirs(directory, exist_ok=True)
+        vectors = np.ascontiguousarray(partition.vectors, dtype=np.float32)
+        with open(os.path.join(directory, "documents.jsonl.tmp"), "w", encoding="utf-8") as f:
+            for document in partition.documents:
+                f.write(json.dumps(document) + "\n")
+        vectors.tofile(os.path.join(directory, "vectors.f32.tmp"))
+        with open(os.path.join(directory, "vectors.json"), "w", encoding="utf-8") as f:
+            json.dump({"dimensions": vectors.shape[1]}, f)
+        os.replace(os.path.join(directory, "vectors.f32.tmp"), os.path.join(directory, "vectors.f32"))
+        os.replace(os.path.join(directory, "documents.jsonl.tmp"), os.path.join(directory, "documents.jsonl"))
+        partition.vectors = self._map_vectors(directory, len(partition.documents))
+
+    def _append(self, thread_id: str, partition: _Partition, records: List[dict], rows: List[Tuple[int, np.ndarray]]):
+        directory = self._partition_dir(thread_id)
+        os.makedirs(directory, exist_ok=True)
+        # Metadata updates append records only; their rows are already stored.
+        if rows:
+            dimensions = len(rows[0][1])
+            # Written with the first rows, including the first after every document was deleted.
+            if len(partition.documents) == len(records) or not os.path.exists(os.path.join(directory, "vectors.json")):
+                with open(os.path.join(directory, "vectors.json"), "w", encoding="utf-8") as f:
+                    json.dump({"dimensions": dimensions}, f)
+            # Vectors go first: rows without a record are ignored on load and overwritten by the next upload.
+            with open(os.path.join(directory, "vectors.f32"), "r+b" if os.path.exists(os.path.join(directory, "vectors.f32")) else "wb") as f:
+                for position, vector in sorted(rows, key=lambda row: row[0]):
+                    f.seek(position * dimensions * 4)
+                    f.write(vector.astype(np.float32).tobytes())
+        with open(os.path.join(directory, "documents.jsonl"), "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        partition.vectors = self._map_vectors(directory, len(partition.documents))
+
+    def upload_documents(self, documents: List[dict]):
+        by_thread: Dict[str, List[dict]] = {}
+        for document in documents:
+            by_thread.setdefault(document["thread_id"], []).append(document)
+
+        with self._lock:
+            for thread_id, uploads in by_thread.items():
+                partition = self._load(thread_id)
+                records, rows = [], []
+                for document in uploads:
+                    vector = np.asarray(document["content_vector"], dtype=np.float32)
+                    norm = np.linalg.norm(vector)
+                    record = {
+                        "id": document["id"],
+                        "content": document["content"],
+                        "metadata": document["metadata"],
+                    }
+                    records.append(record)
+                    rows.append((partition.put(record), vector / norm if norm else vector))
+                if self.path:
+                    self._append(thread_id, partition, records, rows)
+                else:
+                    partition.write_rows(rows)
+
+    def delete_documents(self, thread_id: str, ids: List[str]):
+        ids = set(ids)
+        with self._lock:
+            partition = self._load(thread_id)
+            keep = [i for i, document in enumerate(partition.documents) if document["id"] not in ids]
+            if len(keep) != len(partition.documents):
+                compacted = _Partition([partition.documents[i] for i in keep], np.asarray(partition.vectors[keep]))
+                if self.path:
+                    self._rewrite(thread_id, compacted)
+                self._partitions[thread_id] = compacted
+
+    def update_metadata(self, thread_id: str, metadata: Dict[str, dict]):
+        with self._lock:
+            partition = self._load(thread_id)
+            records = []
+            for document_id, value in metadata.items():
+                position = partition.index.get(document_id)
+                if position is not None:
+                    record = dict(partition.documents[position], metadata=json.dumps(value))
+                    partition.put(record)
+                    records.append(record)
+            if records and self.path:
+                self._append(thread_id, partition, records, [])
+
+    def list_documents(self, thread_id: str) -> List[dict]:
+        with self._lock:
+            documents = list(self._load(thread_id).documents)
+        return [{"id": d["id"], "metadata": json.loads(d["metadata"])} for d in documents]
+
+    def release(self, thread_id: str):
+        # Without persistence the partition is the only copy, so it stays loaded.
+        if self.path:
+            with self._lock:
+                self._partitions.pop(thread_id, None)
+
+    def search(self, thread_id: str, text: str, vector: List[float], k: int = 5) -> List[dict]:
+        # Uploads update partitions in place, so scoring holds the lock too.
+        with self._lock:
+            partition = self._load(thread_id)
+            if not partition.documents:
+                return []
+            query = np.asarray(vector, dtype=np.float32)
+            norm = np.linalg.norm(query)
+            similarities = partition.vectors @ (query / norm if norm else query)
+            keyword_scores = partition.keyword_scores(text)
+            documents = list(partition.documents)
+
+        fused = np.zeros(len(documents), dtype=np.float64)
+        vector_ranking = np.argsort(-similarities)[:k]
+        fused[vector_ranking] += 1.0 / (RRF_K + np.arange(1, len(vector_ranking) + 1))
+        keyword_ranking = [i for i in np.argsort(-keyword_scores)[:KEYWORD_CANDIDATES] if keyword_scores[i] > 0]
+        fused[keyword_ranking] += 1.0 / (RRF_K + np.arange(1, len(keyword_ranking) + 1))
+
+        top = [i for i in np.argsort(-fused)[:k] if fused[i] > 0]
+        return [
+            {
+                "id": documents[i]["id"],
+                "page_content": documents[i]["content"],
+                "metadata": json.loads(documents[i]["metadata"]),
+            }
+            for i in top
+        ]
@@ -0,0 +1,61 @@
+import os
+import sys
+
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+# Every repeat of a prompt would otherwise be answered from the response cache.
+os.environ.setdefault("LLM_CACHE_NODES", "")
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from backend.benchmarks.fakes import FakeChatModel, FakeEmbeddings, count_words
+from backend.src.agent import DocumentGenerationAgent
+from backend.src.cache import SQLiteLRUCache
+from backend.src.embedding_cache import CachedEmbeddings
+from backend.src.graph import create_graph
+from backend.src.llm_cache import LLMResponseCache
+from backend.src.memory import ConversationMemory
+from backend.src.nodes.translate_context_node import TranslateContextNode
+from backend.src.orchestrator import OrchestratorAgent
+from backend.src.translation import ChunkTranslator
+from backend.src.vector_stores.local import LocalVectorStore
+
+
+def build_graph(workdir: str, embedding_latency: float = 0.0, checkpointer=None, **ingestion):
+    """Builds the graph and its agent on the benchmark stand-ins for OpenAI and Azure AI Search."""
+    llm = FakeChatModel(latency=0.0, tokens_per_second=100000, letter_tokens=20)
+    embeddings = CachedEmbeddings(
+        FakeEmbeddings(size=32, latency=embedding_latency),
+        model="fake-embeddings",
+        cache=SQLiteLRUCache(os.path.join(workdir, "embeddings.sqlite"), "embeddings", 100000),
+    )
+    translator = ChunkTranslator(llm, cache=SQLiteLRUCache(os.path.join(workdir, "translations.sqlite"), "translations", 100000))
+    memory = ConversationMemory(llm, token_counter=count_words)
+    response_cache = LLMResponseCache(SQLiteLRUCache(os.path.join(workdir, "llm_responses.sqlite"), "llm_responses", 100000))
+    agent = DocumentGenerationAgent(
+        llm=llm,
+        embeddings=embeddings,
+        vector_store=LocalVectorStore(persist=False),
+        translator=translator,
+        memory=memory,
+        response_cache=response_cache,
+        token_counter=count_words,
+    )
+    for name, value in ingestion.items():
+        setattr(agent.ingestion, name, value)
+    return create_graph(
+        agent=agent,
+        translate_node=TranslateContextNode(translator=translator),
+        orchestrator=OrchestratorAgent(llm=llm, embeddings=embeddings, memory=memory, response_cache=response_cache),
+        checkpointer=checkpointer or MemorySaver(),
+    )
+
+
+@pytest.fixture
+def workdir(tmp_path):
+    return str(tmp_path)
@@ -0,0 +1,60 @@
+import asyncio
+import threading
+
+import pytest
+
+from backend.src.vector_stores import azure
+from backend.src.vector_stores.azure import AzureSearchVectorStore
+
+
+class RecordingClient:
+    def __init__(self, **kwargs):
+        self.closed_on = None
+
+    async def close(self):
+        self.closed_on = asyncio.get_running_loop()
+
+
+@pytest.fixture
+def store(monkeypatch):
+    monkeypatch.setenv("AZURE_SEARCH_INDEX", "test-index")
+    monkeypatch.setenv("AZURE_SEARCH_ENDPOINT", "https://test.search.windows.net")
+    monkeypatch.setenv("AZURE_SEARCH_KEY", "test")
+    monkeypatch.setattr(azure, "AsyncSearchClient", RecordingClient)
+    return AzureSearchVectorStore()
+
+
+def test_client_replaced_for_a_new_loop_is_closed(store):
+    async def client():
+        return store._client_for_loop()
+
+    first = asyncio.run(client())
+
+    async def replace_and_close():
+        second = store._client_for_loop()
+        await store.aclose()
+        return second
+
+    second = asyncio.run(replace_and_close())
+    assert first is not second
+    assert first.closed_on is not None
+    assert second.closed_on is not None
+    assert store._async_client is None
+
+
+def test_client_opened_on_a_running_loop_is_closed_there(store):
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        async def client():
+            return store._client_for_loop()
+
+        first = asyncio.run_coroutine_threadsafe(client(), loop).result()
+        asyncio.run(store.aclose())
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0), loop).result()
+        assert first.closed_on is loop
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
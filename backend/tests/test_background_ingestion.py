@@ -0,0 +1,51 @@
+from fastapi.testclient import TestClient
+
+from backend.benchmarks.pdfs import synthetic_pages, write_pdf
+from backend.src import main, startup
+from backend.src.jobs import IngestionJobQueue
+
+from conftest import build_graph
+
+
+def test_turn_reads_the_first_batch_without_waiting_for_the_whole_job(workdir, monkeypatch):
+    # One chunk per request with 0.5s of embedding latency takes longer than the
+    # retriever's own retries (0s, 1s, 3s), as a large PDF does in production.
+    graph, agent = build_graph(workdir, embedding_latency=0.5, max_batch_items=1, batch_items=1, max_concurrency=1)
+    monkeypatch.setattr(startup, "_graph", (graph, agent))
+    monkeypatch.setattr(main, "UPLOAD_DIR", workdir)
+    monkeypatch.setattr(main, "ingestion_jobs", IngestionJobQueue(main._ingest, workers=1, max_queued=1))
+
+    statuses = []
+    retrieve = agent.retriever.retrieve
+
+    async def retrieve_with_job_status(thread_id, *args, **kwargs):
+        statuses.append(main.ingestion_jobs.get(job_ids[0]).status)
+        return await retrieve(thread_id, *args, **kwargs)
+
+    job_ids = []
+    submit = main.ingestion_jobs.submit
+
+    def remember_job(thread_id, file_paths):
+        job = submit(thread_id, file_paths)
+        job_ids.append(job.id)
+        return job
+
+    monkeypatch.setattr(agent.retriever, "retrieve", retrieve_with_job_status)
+    monkeypatch.setattr(main.ingestion_jobs, "submit", remember_job)
+
+    pdf = f"{workdir}/statement.pdf"
+    write_pdf(pdf, synthetic_pages(3))
+    with open(pdf, "rb") as f:
+        response = TestClient(main.app).post(
+            "/generate",
+            data={"prompt": "Please use the documents I uploaded"},
+            files=[("files", ("statement.pdf", f, "application/pdf"))],
+        )
+
+    assert response.status_code == 200
+    assert statuses == ["running"]
+    assert "still being processed" in response.json()["response"]
+    assert response.json()["ingestion_job_id"] == job_ids[0]
+    values = graph.get_state({"configurable": {"thread_id": response.json()["thread_id"]}}).values
+    assert values["retrieved_context"]
+    assert any("statement.pdf" in chunk["metadata"]["source"] for chunk in values["retrieved_context"])
@@ -0,0 +1,72 @@
+import asyncio
+import operator
+from typing import Annotated, List, TypedDict
+
+from langgraph.graph import END, StateGraph
+
+from backend.src.checkpointer import SQLiteCheckpointSaver
+
+
+class State(TypedDict):
+    steps: Annotated[List[str], operator.add]
+    answer: str
+
+
+def compile_graph(checkpointer):
+    # The same shape as the letter graph: a node that asks for input runs
+    # only after the caller has resumed the interrupted run.
+    workflow = StateGraph(State)
+    workflow.add_node("check", lambda state: {"steps": ["check"]})
+    workflow.add_node("ask", lambda state: {"steps": [f"ask:{state['answer']}"]})
+    workflow.set_entry_point("check")
+    workflow.add_edge("check", "ask")
+    workflow.add_edge("ask", END)
+    return workflow.compile(checkpointer=checkpointer, interrupt_before=["ask"])
+
+
+def test_interrupted_run_resumes_after_restart(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    config = {"configurable": {"thread_id": "thread"}}
+
+    async def first_turn():
+        graph = compile_graph(SQLiteCheckpointSaver(path))
+        await graph.ainvoke({"steps": [], "answer": ""}, config)
+        return await graph.aget_state(config)
+
+    state = asyncio.run(first_turn())
+    assert state.next == ("ask",)
+    assert state.values["steps"] == ["check"]
+
+    async def resume():
+        graph = compile_graph(SQLiteCheckpointSaver(path))
+        await graph.aupdate_state(config, {"answer": "Ada"})
+        await graph.ainvoke(None, config)
+        return await graph.aget_state(config)
+
+    state = asyncio.run(resume())
+    assert state.next == ()
+    assert state.values["steps"] == ["check", "ask:Ada"]
+
+
+def test_checkpoints_are_trimmed_and_idle_threads_evicted(tmp_path):
+    saver = SQLiteCheckpointSaver(str(tmp_path / "checkpoints.sqlite"), max_checkpoints_per_thread=2)
+    graph = compile_graph(saver)
+    for thread_id in ("a", "b"):
+        config = {"configurable": {"thread_id": thread_id}}
+        for turn in range(3):
+            graph.invoke({"steps": [], "answer": ""}, config)
+            graph.update_state(config, {"answer": str(turn)})
+            graph.invoke(None, config)
+
+    stats = saver.stats()
+    assert (stats["threads"], stats["checkpoints"]) == (2, 4)
+    state = graph.get_state({"configurable": {"thread_id": "a"}})
+    assert state.values["steps"][-1] == "ask:2"
+
+    saver.ttl_seconds = 60
+    saver.conn.execute("UPDATE threads SET updated_at = 0 WHERE thread_id = 'a'")
+    saver.conn.commit()
+    assert saver.evict_idle() == ["a"]
+    assert saver.get_tuple({"configurable": {"thread_id": "a", "checkpoint_ns": ""}}) is None
+    assert saver.stats()["threads"] == 1
+
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from backend.benchmarks.fakes import FakeEmbeddings, count_words
+from backend.benchmarks.pdfs import synthetic_pages, write_pdf
+from backend.src.ingestion import PDFIngestionPipeline
+from backend.src.recent_chunks import RecentChunkBuffer
+from backend.src.vector_stores.local import LocalVectorStore
+
+
+def test_edited_file_is_skipped_whole_on_the_next_upload(workdir):
+    def pipeline():
+        # A fresh store instance reads what the previous one persisted.
+        return PDFIngestionPipeline(
+            FakeEmbeddings(size=8),
+            LocalVectorStore(path=f"{workdir}/store"),
+            recent_chunks=RecentChunkBuffer(),
+            token_counter=count_words,
+        )
+
+    pdf = f"{workdir}/statement.pdf"
+    pages = synthetic_pages(3)
+    write_pdf(pdf, pages)
+    ingestion = pipeline()
+    asyncio.run(ingestion.run([pdf], "thread"))
+
+    write_pdf(pdf, pages[:2] + synthetic_pages(1, seed=1))
+    edited = asyncio.run(ingestion.run([pdf], "thread"))
+    assert edited["added"] and edited["removed"] and edited["skipped"]
+
+    messages = []
+
+    async def on_progress(message):
+        messages.append(message)
+
+    for ingestion in (ingestion, pipeline()):
+        again = asyncio.run(ingestion.run([pdf], "thread", on_progress=on_progress))
+        assert again == {"added": 0, "skipped": edited["added"] + edited["skipped"], "removed": 0}
+        assert any("statement.pdf is unchanged" in message for message in messages)
+        messages.clear()
+
+
+def test_failed_reupload_keeps_the_previous_chunks(workdir):
+    store = LocalVectorStore(persist=False)
+    ingestion = PDFIngestionPipeline(FakeEmbeddings(size=8), store, token_counter=count_words)
+    pdf = f"{workdir}/statement.pdf"
+    pages = synthetic_pages(3)
+    write_pdf(pdf, pages)
+    asyncio.run(ingestion.run([pdf], "thread"))
+    before = {document["id"] for document in store.list_documents("thread")}
+
+    def fail(documents):
+        raise RuntimeError("index unavailable")
+
+    store.upload_documents = fail
+    write_pdf(pdf, pages[:2] + synthetic_pages(1, seed=1))
+    with pytest.raises(ExceptionGroup):
+        asyncio.run(ingestion.run([pdf], "thread"))
+
+    assert {document["id"] for document in store.list_documents("thread")} == before
@@ -0,0 +1,66 @@
+import json
+import os
+
+import numpy as np
+
+from backend.src.vector_stores.local import LocalVectorStore, _Partition
+
+
+def _documents(thread_id, start, count, dimensions=8):
+    return [
+        {
+            "id": f"chunk-{i}",
+            "content": f"passage {i} about grid storage research" if i % 2 else f"passage {i} about clinical trials",
+            "metadata": json.dumps({"page": i}),
+            "thread_id": thread_id,
+            "content_vector": np.random.default_rng(i).normal(size=dimensions).tolist(),
+        }
+        for i in range(start, start + count)
+    ]
+
+
+def test_batches_are_appended_and_survive_a_restart(tmp_path):
+    store = LocalVectorStore(path=str(tmp_path))
+    batches = [_documents("t", start, 10) for start in range(0, 50, 10)]
+    for batch in batches:
+        store.upload_documents(batch)
+    # A re-uploaded chunk replaces the stored one instead of adding a row.
+    replaced = dict(batches[0][3], content="replaced passage about clinical trials")
+    store.upload_documents([replaced])
+
+    directory = store._partition_dir("t")
+    assert os.path.getsize(os.path.join(directory, "vectors.f32")) == 50 * 8 * 4
+
+    reopened = LocalVectorStore(path=str(tmp_path))
+    for candidate in (store, reopened):
+        partition = candidate._load("t")
+        assert len(partition.documents) == 50
+        assert partition.documents[3]["content"] == "replaced passage about clinical trials"
+        # Incremental BM25 statistics match a partition built from scratch.
+        rebuilt = _Partition(partition.documents)
+        assert +partition.doc_freqs == rebuilt.doc_freqs
+        assert partition.doc_lengths == rebuilt.doc_lengths
+        top = candidate.search("t", "", batches[2][4]["content_vector"], k=1)
+        assert top[0]["id"] == "chunk-24"
+
+
+def test_delete_compacts_the_partition(tmp_path):
+    store = LocalVectorStore(path=str(tmp_path))
+    store.upload_documents(_documents("t", 0, 6))
+    store.delete_documents("t", ["chunk-0", "chunk-1"])
+    store.upload_documents(_documents("t", 6, 2))
+
+    reopened = LocalVectorStore(path=str(tmp_path))
+    ids = [document["id"] for document in reopened.list_documents("t")]
+    assert ids == ["chunk-2", "chunk-3", "chunk-4", "chunk-5", "chunk-6", "chunk-7"]
+    assert reopened.search("t", "", _documents("t", 7, 1)[0]["content_vector"], k=1)[0]["id"] == "chunk-7"
+    assert reopened.search("t", "clinical trials", _documents("t", 7, 1)[0]["content_vector"], k=6)
+
+
+def test_in_memory_partition_grows_across_batches():
+    store = LocalVectorStore(persist=False)
+    for start in range(0, 30, 3):
+        store.upload_documents(_documents("t", start, 3))
+    partition = store._load("t")
+    assert partition.vectors.shape == (30, 8)
+    assert store.search("t", "", _documents("t", 17, 1)[0]["content_vector"], k=1)[0]["id"] == "chunk-17"
@@ -0,0 +1,78 @@
+import asyncio
+import json
+
+import httpx
+
+from backend.src.rate_limit import AsyncGovernedTransport, RateLimitGovernor, caller_backoff
+
+EMBEDDINGS_URL = "https://api.openai.com/v1/embeddings"
+
+
+def _transport(statuses):
+    responses = iter(statuses)
+    sent = []
+
+    def handler(request):
+        sent.append(request)
+        status = next(responses)
+        if status == 429:
+            return httpx.Response(429, headers={"retry-after-ms": "10"}, json={"error": {"code": "rate_limit_exceeded"}})
+        return httpx.Response(status, json={"usage": {"total_tokens": 3}})
+
+    governor = RateLimitGovernor(limits={"text-embedding-3-large": (600, 60000)})
+    return AsyncGovernedTransport(httpx.MockTransport(handler), governor, max_retries=3), governor, sent
+
+
+async def _post(transport):
+    async with httpx.AsyncClient(transport=transport) as client:
+        return await client.post(EMBEDDINGS_URL, json={"model": "text-embedding-3-large", "input": [[1, 2, 3]]})
+
+
+def test_429_is_retried_with_backoff():
+    transport, _, sent = _transport([429, 200])
+    response = asyncio.run(_post(transport))
+    assert response.status_code == 200
+    assert len(sent) == 2
+
+
+def test_429_is_returned_to_callers_that_back_off_themselves():
+    transport, governor, sent = _transport([429, 200])
+
+    async def post():
+        with caller_backoff():
+            return await _post(transport)
+
+    response = asyncio.run(post())
+    assert response.status_code == 429
+    assert len(sent) == 1
+    # Other callers of the model still wait out the retry-after.
+    assert governor._budget("text-embedding-3-large").paused_until > 0
+
+
+def test_streamed_completion_settles_from_its_usage_chunk():
+    events = [
+        {"choices": [{"delta": {"content": "Dear"}}]},
+        {"choices": [], "usage": {"total_tokens": 42}},
+    ]
+    body = "".join(f"data: {json.dumps(event)}\n\n" for event in events) + "data: [DONE]\n\n"
+
+    class EventStream(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            for line in body.encode().splitlines(keepends=True):
+                yield line
+
+    def handler(request):
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, stream=EventStream())
+
+    governor = RateLimitGovernor(limits={"gpt-5": (600, 60000)})
+    transport = AsyncGovernedTransport(httpx.MockTransport(handler), governor, max_retries=0, completion_tokens=1000)
+
+    async def stream():
+        async with httpx.AsyncClient(transport=transport) as client:
+            request = {"model": "gpt-5", "stream": True, "stream_options": {"include_usage": True}, "messages": []}
+            async with client.stream("POST", "https://api.openai.com/v1/chat/completions", json=request) as response:
+                return b"".join([chunk async for chunk in response.aiter_bytes()])
+
+    assert asyncio.run(stream()) == body.encode()
+    # Only the 42 tokens reported are charged, not the 1000-token completion estimate.
+    assert round(governor.stats()["gpt-5"]["tokens_available"]) == 60000 - 42
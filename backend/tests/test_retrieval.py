@@ -0,0 +1,55 @@
+import asyncio
+
+from backend.benchmarks.fakes import FakeEmbeddings
+from backend.src.recent_chunks import RecentChunkBuffer
+from backend.src.retrieval import RRF_K, MultiQueryRetriever
+from backend.src.vector_stores.local import LocalVectorStore
+
+
+def test_chunk_in_index_and_buffer_counts_once_per_sub_query():
+    embeddings = FakeEmbeddings(size=16)
+    texts = [f"The client led project {i} and published paper {i}." for i in range(6)]
+    documents = [
+        {
+            "id": f"chunk-{i}",
+            "content": text,
+            "content_vector": vector,
+            "thread_id": "thread",
+            "metadata": '{"source": "cv.pdf"}',
+        }
+        for i, (text, vector) in enumerate(zip(texts, embeddings.embed_documents(texts)))
+    ]
+    store = LocalVectorStore(persist=False)
+    store.upload_documents(documents)
+    # Freshly ingested chunks sit in the index and the buffer at the same time.
+    recent_chunks = RecentChunkBuffer()
+    recent_chunks.add("thread", documents)
+    sections = {"credentials": "degrees and positions", "achievements": "projects and papers"}
+    retriever = MultiQueryRetriever(embeddings, store, recent_chunks=recent_chunks, sections=sections, per_query_k=3)
+
+    context = asyncio.run(retriever.retrieve("thread", "Write a letter about the client's research"))
+
+    sub_queries = len(sections) + 1
+    assert context
+    assert all(chunk["score"] <= sub_queries / (RRF_K + 1) + 1e-9 for chunk in context)
+    assert len({chunk["page_content"] for chunk in context}) == len(context)
+
+
+def test_buffer_is_scored_against_every_query_in_one_pass():
+    embeddings = FakeEmbeddings(size=16)
+    texts = ["first chunk", "second chunk", "third chunk"]
+    vectors = embeddings.embed_documents(texts)
+    recent_chunks = RecentChunkBuffer()
+    recent_chunks.add(
+        "thread",
+        [
+            {"id": text, "content": text, "content_vector": vector, "metadata": "{}"}
+            for text, vector in zip(texts, vectors)
+        ],
+    )
+
+    rankings = recent_chunks.search_many("thread", vectors, k=2)
+
+    assert [ranking[0]["id"] for ranking in rankings] == texts
+    assert all(len(ranking) == 2 for ranking in rankings)
+    assert recent_chunks.search_many("other", vectors, k=2) == [[], [], []]